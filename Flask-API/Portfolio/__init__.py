@@ -7,6 +7,6 @@ This package contains the core logic for:
 """
 
 from .generator import generate_portfolio
-from .enhancer import enhance_content
+from .enhancer import enhance_content, enhance_fields
 
-__all__ = ["generate_portfolio", "enhance_content"]
+__all__ = ["generate_portfolio", "enhance_content", "enhance_fields"]
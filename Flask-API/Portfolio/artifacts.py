@@ -0,0 +1,153 @@
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from . import compression, metrics
+
+# Rendered portfolios, one file per content hash
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join("output", "artifacts"))
+
+# Eviction bounds: total size of the store and age of an artifact since last use
+MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(500 * 1024 * 1024)))
+MAX_AGE = float(os.getenv("ARTIFACT_MAX_AGE", str(7 * 24 * 3600)))
+
+# Minimum seconds between eviction sweeps in one process
+EVICT_INTERVAL = float(os.getenv("ARTIFACT_EVICT_INTERVAL", "60"))
+
+# Store artifacts minified, with gzip (and brotli, if installed) copies for Accept-Encoding
+MINIFY = os.getenv("ARTIFACT_MINIFY", "true").lower() not in ("0", "false", "no")
+PRECOMPRESS = os.getenv("ARTIFACT_PRECOMPRESS", "true").lower() not in ("0", "false", "no")
+
+_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+_last_evict = 0.0
+_evict_lock = threading.Lock()
+
+
+def artifact_id(template_file: str, data: dict, *salt: str) -> str:
+    """
+    Content address of a portfolio: a hash of the template and the canonical JSON of its input.
+
+    Args:
+        template_file (str): Template the portfolio is rendered with.
+        data (dict): Portfolio input before enhancement.
+        *salt (str): Anything else that changes the output, such as the model name.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    for part in (template_file, *salt, canonical):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def path_for(artifact: str) -> str:
+    """Filesystem path of an artifact id; raises ValueError for anything that is not an id."""
+    if not _ID_PATTERN.match(artifact or ""):
+        raise ValueError(f"Invalid artifact id: {artifact}")
+    return os.path.join(ARTIFACT_DIR, f"{artifact}.html")
+
+
+def find(artifact: str) -> str | None:
+    """Return the path of a stored artifact and mark it as recently used, or None."""
+    try:
+        path = path_for(artifact)
+    except ValueError:
+        return None
+    if not os.path.exists(path):
+        metrics.cache_requests.inc(cache="artifacts", result="miss")
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    metrics.cache_requests.inc(cache="artifacts", result="hit")
+    return path
+
+
+def encoded(path: str, encoding: str) -> str | None:
+    """Path of an artifact's stored copy in a Content-Encoding ("gzip", "br"), or None if there is none."""
+    variant = path + compression.SUFFIXES.get(encoding, "")
+    return variant if variant != path and os.path.exists(variant) else None
+
+
+def _write(path: str, data: bytes):
+    """Atomically write a file: readers see either the old file or the complete new one."""
+    fd, tmp_path = tempfile.mkstemp(dir=ARTIFACT_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save(artifact: str, html_content: str) -> str:
+    """
+    Atomically write an artifact, minified, along with its compressed copies.
+
+    Returns:
+        str: Path of the stored artifact.
+    """
+    path = path_for(artifact)
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    data = (compression.minify_html(html_content) if MINIFY else html_content).encode("utf-8")
+    if PRECOMPRESS:
+        # Written first, so whoever finds the artifact also finds its copies
+        for encoding in compression.ENCODINGS:
+            _write(path + compression.SUFFIXES[encoding], compression.compress(data, encoding))
+    _write(path, data)
+    maybe_evict()
+    return path
+
+
+def maybe_evict():
+    """Run evict() if this process has not swept within EVICT_INTERVAL."""
+    global _last_evict
+    with _evict_lock:
+        if time.time() - _last_evict < EVICT_INTERVAL:
+            return
+        _last_evict = time.time()
+    evict()
+
+
+def evict() -> int:
+    """
+    Delete artifacts unused for MAX_AGE, then the least recently used until under MAX_BYTES.
+
+    An artifact and its compressed copies count and go together; its last use
+    is the newest mtime among them (find() touches the HTML file).
+
+    Returns:
+        int: Number of files removed.
+    """
+    try:
+        groups = {}
+        for entry in os.scandir(ARTIFACT_DIR):
+            if entry.is_file():
+                stat = entry.stat()
+                base = entry.name.split(".", 1)[0]
+                mtime, size, paths = groups.get(base, (0.0, 0, []))
+                groups[base] = (max(mtime, stat.st_mtime), size + stat.st_size, paths + [entry.path])
+    except FileNotFoundError:
+        return 0
+
+    now = time.time()
+    entries = sorted(groups.values())
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, paths in entries:
+        if now - mtime <= MAX_AGE and total <= MAX_BYTES:
+            break
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        total -= size
+    return removed
@@ -0,0 +1,257 @@
+"""
+Asset build step for exported and served portfolios.
+
+Copies every file under static/ to ASSET_DIR under a content-fingerprinted
+name, so it can be cached by browsers for a year. Images wider than
+MAX_IMAGE_WIDTH are scaled down, and each image gets a WebP variant, when
+Pillow is installed. Templates link assets through the asset_url() global,
+and optional images through optimized_url(), which only links reduced builds.
+
+Usage (from Flask-API/):
+    python -m Portfolio.assets
+"""
+import os
+import re
+import json
+import base64
+import shutil
+import hashlib
+import mimetypes
+import threading
+from .logs import get_logger
+
+try:
+    from PIL import Image
+except ImportError:  # optional: without Pillow images are fingerprinted but not recompressed
+    Image = None
+
+logger = get_logger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source assets, served unmodified under /static
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+
+# Built, fingerprinted assets, served under /assets
+ASSET_DIR = os.getenv("ASSET_DIR", os.path.join(BASE_DIR, "output", "assets"))
+
+# Browser cache lifetime of fingerprinted assets, in seconds
+MAX_AGE = int(os.getenv("ASSET_MAX_AGE", str(365 * 24 * 3600)))
+
+# Images wider than this are scaled down; WEBP_QUALITY applies to the WebP variants
+MAX_IMAGE_WIDTH = int(os.getenv("ASSET_MAX_IMAGE_WIDTH", "1920"))
+WEBP_QUALITY = int(os.getenv("ASSET_WEBP_QUALITY", "80"))
+
+# Assets larger than this stay linked in self-contained exports instead of inlined; well below
+# an unoptimized image, so only reduced builds are ever inlined
+INLINE_MAX_BYTES = int(os.getenv("ASSET_INLINE_MAX_BYTES", str(256 * 1024)))
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Local asset references in rendered HTML: src/href attributes and CSS url()
+_REFERENCE = re.compile(r"""(?P<open>["'(])(?P<url>/(?:assets|static)/[^"'()\s?#]+)(?P<close>["')])""")
+
+_manifest = None
+_manifest_version = None
+_manifest_lock = threading.Lock()
+_data_uris = {}
+
+
+def _fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def _build_image(source: str, target: str, webp_target: str):
+    """Write an image scaled down to MAX_IMAGE_WIDTH, in its own format and as WebP."""
+    with Image.open(source) as image:
+        if image.width > MAX_IMAGE_WIDTH:
+            image = image.resize((MAX_IMAGE_WIDTH, round(image.height * MAX_IMAGE_WIDTH / image.width)), Image.LANCZOS)
+            if target.lower().endswith(".png"):
+                image.save(target)
+            else:
+                image.convert("RGB").save(target, quality=85, optimize=True, progressive=True)
+        else:
+            # Lossless PNG re-optimization costs seconds for a percent or two; WebP is where the bytes go
+            shutil.copyfile(source, target)
+        image.save(webp_target, "WEBP", quality=WEBP_QUALITY, method=6)
+
+
+def build() -> dict:
+    """
+    Build every asset under STATIC_DIR into ASSET_DIR and write its manifest.
+
+    Assets whose fingerprinted output already exists are not rebuilt.
+
+    Returns:
+        dict: Logical path (relative to static/) -> {"file", "bytes", "source" (mtime, size)
+            and "webp"/"webp_bytes" for images}.
+    """
+    manifest = {}
+    if not os.path.isdir(STATIC_DIR):
+        return manifest
+    if Image is None:
+        logger.info("Pillow not installed, images are fingerprinted without recompression")
+
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, STATIC_DIR).replace(os.sep, "/")
+            stem, ext = os.path.splitext(logical)
+            fingerprint = _fingerprint(source)
+            entry = {"file": f"{stem}.{fingerprint}{ext}"}
+            target = os.path.join(ASSET_DIR, entry["file"])
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+
+            if Image is not None and ext.lower() in IMAGE_EXTENSIONS:
+                entry["webp"] = f"{stem}.{fingerprint}.webp"
+                webp_target = os.path.join(ASSET_DIR, entry["webp"])
+                if not (os.path.exists(target) and os.path.exists(webp_target)):
+                    try:
+                        _build_image(source, target, webp_target)
+                    except OSError as e:
+                        logger.warning("Image optimization failed, copying as is", asset=logical, error=str(e))
+                        shutil.copyfile(source, target)
+                        del entry["webp"]
+            elif not os.path.exists(target):
+                shutil.copyfile(source, target)
+
+            stat = os.stat(source)
+            entry["source"] = [stat.st_mtime, stat.st_size]
+            entry["bytes"] = os.path.getsize(target)
+            if "webp" in entry:
+                entry["webp_bytes"] = os.path.getsize(os.path.join(ASSET_DIR, entry["webp"]))
+            manifest[logical] = entry
+            logger.info("Built asset", asset=logical, source_bytes=stat.st_size, **{k: v for k, v in entry.items() if k.endswith("bytes")})
+
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    with open(os.path.join(ASSET_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _is_current(manifest: dict) -> bool:
+    """Whether a manifest covers exactly the files now under STATIC_DIR, unchanged since they were built."""
+    sources = {}
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            sources[os.path.relpath(path, STATIC_DIR).replace(os.sep, "/")] = [stat.st_mtime, stat.st_size]
+    return sources.keys() == manifest.keys() and all(
+        manifest[logical].get("source") == source and os.path.exists(os.path.join(ASSET_DIR, manifest[logical]["file"]))
+        for logical, source in sources.items()
+    )
+
+
+def get_manifest() -> dict:
+    """
+    Return the asset manifest, loaded once per process. The assets are built
+    first if there is no manifest yet or static/ changed since it was written;
+    files already built are kept.
+    """
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                try:
+                    with open(os.path.join(ASSET_DIR, "manifest.json"), encoding="utf-8") as f:
+                        manifest = json.load(f)
+                    if not _is_current(manifest):
+                        logger.info("Static assets changed, rebuilding")
+                        manifest = None
+                except (OSError, ValueError):
+                    manifest = None
+                if manifest is None:
+                    try:
+                        manifest = build()
+                    except OSError as e:
+                        logger.warning("Asset build failed, serving static files as is", error=str(e))
+                        manifest = {}
+                _manifest = manifest
+    return _manifest
+
+
+def manifest_version() -> str:
+    """Hash of the asset URLs in the manifest, so caches of pages that embed them change when they do."""
+    global _manifest_version
+    if _manifest_version is None:
+        urls = {logical: [entry["file"], entry.get("webp")] for logical, entry in get_manifest().items()}
+        _manifest_version = hashlib.sha256(json.dumps(urls, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return _manifest_version
+
+
+def asset_url(path: str) -> str:
+    """
+    URL of a static asset for templates: its WebP or fingerprinted build under
+    /assets when there is one, else the source file under /static.
+    """
+    entry = get_manifest().get(path.lstrip("/"))
+    if not entry:
+        return f"/static/{path.lstrip('/')}"
+    return f"/assets/{entry.get('webp') or entry['file']}"
+
+
+def optimized_url(path: str) -> str | None:
+    """
+    URL of an image's reduced (WebP) build, or None when there is none, e.g.
+    without Pillow. For optional images that are only worth their weight reduced.
+    """
+    entry = get_manifest().get(path.lstrip("/"))
+    return f"/assets/{entry['webp']}" if entry and entry.get("webp") else None
+
+
+def _local_file(url: str) -> str | None:
+    """
+    Filesystem path of the smallest build of an /assets or /static URL (its
+    WebP variant if any), if it names a file inside that directory.
+    """
+    prefix, _, relative = url.lstrip("/").partition("/")
+    manifest = get_manifest()
+    if prefix == "static":
+        entry = manifest.get(relative)
+    else:
+        entry = next((e for e in manifest.values() if relative in (e["file"], e.get("webp"))), None)
+    if entry:
+        prefix, relative = "assets", entry.get("webp") or entry["file"]
+    directory = os.path.realpath(ASSET_DIR if prefix == "assets" else STATIC_DIR)
+    path = os.path.realpath(os.path.join(directory, relative))
+    if not path.startswith(directory + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _data_uri(path: str) -> str | None:
+    """data: URI of a file, or None if it is over INLINE_MAX_BYTES; kept per path and mtime."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime)
+    if key not in _data_uris:
+        if stat.st_size > INLINE_MAX_BYTES:
+            _data_uris[key] = None
+        else:
+            mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            with open(path, "rb") as f:
+                _data_uris[key] = f"data:{mimetype};base64,{base64.b64encode(f.read()).decode('ascii')}"
+    return _data_uris[key]
+
+
+def inline(html_content: str) -> str:
+    """
+    Make a rendered portfolio self-contained: every local asset it references
+    is replaced by a data: URI. Unreferenced assets add nothing; remote
+    (CDN) URLs and assets over INLINE_MAX_BYTES stay linked.
+    """
+    def replace(match):
+        path = _local_file(match.group("url"))
+        uri = _data_uri(path) if path else None
+        return f"{match.group('open')}{uri}{match.group('close')}" if uri else match.group(0)
+
+    return _REFERENCE.sub(replace, html_content)
+
+
+if __name__ == "__main__":
+    for logical, entry in build().items():
+        print(f"{logical} -> {entry}")
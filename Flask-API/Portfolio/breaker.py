@@ -0,0 +1,118 @@
+import time
+import threading
+from . import metrics
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Values of the portfolio_circuit_state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency and lets callers fail fast instead.
+
+    Callers ask allow() before each call and report its outcome:
+
+        if not breaker.allow():
+            raise CircuitOpenError(...)
+        try:
+            result = call()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(elapsed)
+
+    Closed: calls go through. `failure_threshold` consecutive failures, where a
+    call slower than `slow_call_seconds` counts as a failure, open the circuit.
+    Open: calls are rejected with CircuitOpenError until `reset_timeout` seconds
+    have passed. Half-open: up to `probes` calls are let through; that many
+    successes close the circuit, any failure opens it again.
+
+    State is per process and shared by every thread in it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 slow_call_seconds: float | None = None, probes: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds
+        self.probes = max(1, probes)
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        metrics.circuit_state.set(STATE_VALUES[CLOSED], breaker=name)
+
+    def _transition(self, state: str):
+        self.state = state
+        metrics.circuit_state.set(STATE_VALUES[state], breaker=self.name)
+        metrics.circuit_transitions.inc(breaker=self.name, to=state)
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning("Circuit opened", breaker=self.name, failures=self._failures, reset_timeout=self.reset_timeout)
+        else:
+            logger.info(f"Circuit {state.replace('_', '-')}", breaker=self.name)
+        self._failures = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected (the reset timeout has not passed yet)."""
+        return self.state == OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """
+        Reserve permission for one call; False means fail fast.
+
+        Every allowed call must be followed by record_success(), record_failure() or release().
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN and self._probes_in_flight >= self.probes):
+                metrics.circuit_rejected.inc(breaker=self.name)
+                return False
+            if self.state == HALF_OPEN:
+                self._probes_in_flight += 1
+            return True
+
+    def record_success(self, elapsed: float = 0.0):
+        if self.slow_call_seconds is not None and elapsed >= self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_in_flight -= 1
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self._transition(CLOSED)
+            else:
+                self._failures = 0
+
+    def release(self):
+        """Give back an allowed call's reservation without counting it either way."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+            elif self.state == CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._transition(OPEN)
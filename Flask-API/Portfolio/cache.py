@@ -0,0 +1,170 @@
+import os
+import time
+import sqlite3
+import threading
+from . import metrics
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+# One SQLite file shared by every worker process; override with CACHE_DB_PATH
+DEFAULT_DB_PATH = os.getenv(
+    "CACHE_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "cache.sqlite3"),
+)
+
+
+class SQLiteCache:
+    """
+    Persistent key/value cache backed by a SQLite table in WAL mode.
+
+    Every process opens its own connections to the same file, so gunicorn
+    workers share entries. Entries expire after `ttl` seconds and the table is
+    trimmed to `max_entries` by least-recent access. Storage errors never
+    propagate: a broken cache behaves like an empty one.
+    """
+
+    def __init__(self, name: str, path: str | None = None, ttl: float | None = None, max_entries: int | None = None):
+        self.name = name
+        self.table = f"cache_{name}"
+        self.path = path or DEFAULT_DB_PATH
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.cache_requests.inc(cache=self.name, result="hit" if hit else "miss")
+
+    def get_entry(self, key: str) -> tuple[str, float] | None:
+        """
+        Look up a key.
+
+        Returns:
+            tuple[str, float] | None: (value, created_at) or None on a miss.
+        """
+        try:
+            conn = self._connect()
+            row = conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(False)
+                return None
+
+            now = time.time()
+            if self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count(False)
+                return None
+
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._count(True)
+            return row[0], row[1]
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache read failed", cache=self.name, error=str(e))
+            self._count(False)
+            return None
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for key, or None."""
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: str):
+        """Store a value and evict the least recently used entries over max_entries."""
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.max_entries:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache write failed", cache=self.name, error=str(e))
+
+    def items(self) -> list[tuple[str, str]]:
+        """Every unexpired (key, value) pair, oldest first."""
+        try:
+            query = f"SELECT key, value FROM {self.table}"
+            params = ()
+            if self.ttl is not None:
+                query += " WHERE created_at >= ?"
+                params = (time.time() - self.ttl,)
+            return self._connect().execute(query + " ORDER BY created_at", params).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache read failed", cache=self.name, error=str(e))
+            return []
+
+    def delete(self, key: str):
+        """Remove a single entry."""
+        try:
+            self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache delete failed", cache=self.name, error=str(e))
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every entry whose key starts with prefix and return how many were removed."""
+        try:
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            cursor = self._connect().execute(
+                f"DELETE FROM {self.table} WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",)
+            )
+            return cursor.rowcount
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache delete failed", cache=self.name, error=str(e))
+            return 0
+
+    def clear(self):
+        """Remove every entry."""
+        try:
+            self._connect().execute(f"DELETE FROM {self.table}")
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache clear failed", cache=self.name, error=str(e))
+
+    def open(self):
+        """Open this thread's connection and create the table now instead of on first use."""
+        try:
+            self._connect()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache open failed", cache=self.name, error=str(e))
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process and the shared entry count."""
+        try:
+            entries = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        except (sqlite3.Error, OSError):
+            entries = None
+        return {"name": self.name, "hits": self.hits, "misses": self.misses, "entries": entries}
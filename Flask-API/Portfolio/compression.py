@@ -0,0 +1,94 @@
+import os
+import re
+import gzip
+from .logs import get_logger
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are produced
+    brotli = None
+
+logger = get_logger(__name__)
+
+# Compression levels for stored artifact variants; they are made once per artifact, so favour size over speed
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "9"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "11"))
+
+# Levels for previews, compressed on the request thread and rarely requested twice
+# while a form is being edited, so favour speed
+PREVIEW_GZIP_LEVEL = int(os.getenv("PREVIEW_GZIP_LEVEL", "6"))
+PREVIEW_BROTLI_QUALITY = int(os.getenv("PREVIEW_BROTLI_QUALITY", "4"))
+
+# Encodings variants are stored in, best first, and their file suffixes
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Elements whose content is whitespace-sensitive or not HTML
+_RAW_ELEMENT = re.compile(r"(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+# Not ":", whose surrounding space is significant in selectors ("a :hover")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def _minify_markup(markup: str) -> str:
+    return _WHITESPACE.sub(" ", _COMMENT.sub("", markup))
+
+
+def _minify_css(css: str) -> str:
+    css = _CSS_PUNCTUATION.sub(r"\1", _WHITESPACE.sub(" ", _CSS_COMMENT.sub("", css)))
+    return css.replace(";}", "}").strip()
+
+
+def _minify_js(js: str) -> str:
+    # Line breaks are kept so automatic semicolon insertion still applies
+    return "\n".join(line.strip() for line in js.splitlines() if line.strip())
+
+
+def minify_html(html: str) -> str:
+    """
+    Shrink rendered HTML without changing how it displays: comments are
+    dropped and whitespace runs collapse to one space, inline CSS loses
+    comments and spacing, and inline JS loses indentation and blank lines.
+    <pre> and <textarea> content is left as is.
+    """
+    parts = []
+    last = 0
+    for match in _RAW_ELEMENT.finditer(html):
+        parts.append(_minify_markup(html[last:match.start()]))
+        element, body = match.group(2).lower(), match.group(3)
+        if element == "style":
+            body = _minify_css(body)
+        elif element == "script":
+            body = _minify_js(body)
+        parts.append(_minify_markup(match.group(1)) + body + match.group(4))
+        last = match.end()
+    parts.append(_minify_markup(html[last:]))
+    return "".join(parts).strip()
+
+
+def compress(data: bytes, encoding: str, fast: bool = False) -> bytes:
+    """
+    Encode data as "gzip" or "br" (Content-Encoding names).
+
+    Args:
+        fast (bool): Use the preview levels instead of the maximum artifact levels.
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=PREVIEW_BROTLI_QUALITY if fast else BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=PREVIEW_GZIP_LEVEL if fast else GZIP_LEVEL, mtime=0)
+
+
+def negotiate(accept_encodings) -> str | None:
+    """
+    Best stored encoding the client accepts, or None for identity.
+
+    Args:
+        accept_encodings: The request's parsed Accept-Encoding (werkzeug Accept).
+    """
+    for encoding in ENCODINGS:
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
@@ -0,0 +1,59 @@
+import time
+import contextvars
+from contextlib import contextmanager
+
+# Monotonic time by which the current request or job must finish, or None for no limit
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of starting work that the current deadline leaves no time for."""
+
+
+@contextmanager
+def scope(seconds: float | None):
+    """
+    Run the enclosed block under a new deadline `seconds` from now (None for no limit).
+
+    The deadline replaces any inherited one, so a background job copied from a
+    request's context gets its own budget rather than the request's.
+    """
+    token = _deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def start(seconds: float | None):
+    """Set the deadline `seconds` from now for the rest of the current context, e.g. a request."""
+    _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline (never negative), or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def clamp(timeout):
+    """
+    Shorten a requests-style timeout (seconds or a (connect, read) tuple) so it
+    ends by the deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    if isinstance(timeout, tuple):
+        return tuple(left if part is None else min(part, left) for part in timeout)
+    return left if timeout is None else min(timeout, left)
@@ -1,57 +1,190 @@
 import os
+import json
 import time
 import random
-from dotenv import load_dotenv
-import google.generativeai as genai
+import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from . import metrics
+from . import deadline
+from .breaker import CircuitBreaker, CircuitOpenError
+from .cache import SQLiteCache
+from .deadline import DeadlineExceeded
+from .logs import bind_context, get_logger
+from .provider import MODEL_NAME, provider
+from .scheduler import Scheduler, SharedTokenBucket, estimate_tokens
 
-# Load environment variables
-load_dotenv()
+logger = get_logger(__name__)
 
-# Configure the Google Generative AI client
-try:
-    API_KEY = os.getenv("GEMINI_API_KEY")
-    if not API_KEY:
-        raise ValueError("GEMINI_API_KEY not found in environment variables.")
-    genai.configure(api_key=API_KEY)
-except Exception as e:
-    print(f"Error configuring Gemini API: {e}")
+# Maximum number of enhancement calls in flight at once per fan-out
+MAX_CONCURRENCY = int(os.getenv("ENHANCE_MAX_CONCURRENCY", "4"))
 
-# Initialize the model once
-try:
-    model = genai.GenerativeModel("gemini-1.5-pro")
-except Exception as e:
-    print(f"Error initializing Gemini model: {e}")
-    model = None
+# "portfolio" sends every field in one structured request, "fields" makes one call per field
+ENHANCE_MODE = os.getenv("ENHANCE_MODE", "portfolio")
 
+# Enhancements are cached by a hash of model name + prompt, shared across workers
+CACHE_ENABLED = os.getenv("ENHANCE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+enhancement_cache = SQLiteCache(
+    "enhancements",
+    ttl=float(os.getenv("ENHANCE_CACHE_TTL", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("ENHANCE_CACHE_MAX_ENTRIES", "10000")),
+)
 
-def enhance_content(prompt_instruction: str, content: str, retries: int = 3) -> str:
+
+# Fail fast instead of retrying while Gemini is down or unusually slow
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30")),
+    slow_call_seconds=float(os.getenv("GEMINI_BREAKER_SLOW_SECONDS", "20")),
+    probes=int(os.getenv("GEMINI_BREAKER_PROBES", "2")),
+)
+
+# Gemini quota shared by every worker, in requests and estimated tokens per minute; 0 disables a limit
+gemini_limits = SharedTokenBucket("gemini", {
+    "requests": float(os.getenv("GEMINI_RPM", "60")),
+    "tokens": float(os.getenv("GEMINI_TPM", "1000000")),
+})
+
+# Calls wait here for quota; bulk work may not use the last GEMINI_BULK_RESERVE of it
+gemini_scheduler = Scheduler(gemini_limits, bulk_reserve=float(os.getenv("GEMINI_BULK_RESERVE", "0.2")))
+
+
+def _cache_key(full_prompt: str) -> str:
+    """Content-addressed cache key for a prompt sent to the configured model."""
+    return hashlib.sha256(f"{MODEL_NAME}\0{full_prompt}".encode("utf-8")).hexdigest()
+
+
+def _cache_get(full_prompt: str) -> str | None:
+    return enhancement_cache.get(_cache_key(full_prompt)) if CACHE_ENABLED else None
+
+
+def _cache_set(full_prompt: str, value: str):
+    if CACHE_ENABLED:
+        enhancement_cache.set(_cache_key(full_prompt), value)
+
+
+def _generate(kind: str, full_prompt: str, **kwargs):
     """
-    Enhances a single piece of content using Gemini API with retry logic.
+    Call the model once the shared rate limits allow it; an identical call
+    already in flight answers this one too.
+
+    Raises:
+        CircuitOpenError: If Gemini has been failing and the call was not attempted.
+        DeadlineExceeded: If the call could not be made and answered within the current deadline.
     """
-    if not content or not content.strip():
-        return ""
+    if gemini_breaker.is_open():
+        # Fail before queueing for quota the call would not use
+        metrics.circuit_rejected.inc(breaker=gemini_breaker.name)
+        metrics.llm_calls.inc(kind=kind, outcome="rejected")
+        raise CircuitOpenError("Circuit gemini is open")
+    key = _cache_key(json.dumps([full_prompt, kwargs], sort_keys=True, default=str))
+    return gemini_scheduler.run(kind, key, estimate_tokens(full_prompt), functools.partial(_call, kind, full_prompt, **kwargs))
 
-    full_prompt = (
+
+def _call(kind: str, full_prompt: str, **kwargs):
+    """
+    Call the model through the circuit breaker and within the current deadline,
+    recording the call's latency and outcome under `kind`.
+
+    Raises:
+        CircuitOpenError: If Gemini has been failing and the call was not attempted.
+        DeadlineExceeded: If no time was left for the call or the deadline cut it off.
+    """
+    left = deadline.remaining()
+    if left is not None:
+        if left <= 0:
+            metrics.llm_calls.inc(kind=kind, outcome="deadline")
+            raise DeadlineExceeded("Request deadline exceeded")
+        kwargs["request_options"] = {"timeout": left}
+    if not gemini_breaker.allow():
+        metrics.llm_calls.inc(kind=kind, outcome="rejected")
+        raise CircuitOpenError("Circuit gemini is open")
+
+    start = time.perf_counter()
+    try:
+        response = provider.get_model().generate_content(full_prompt, **kwargs)
+    except Exception as e:
+        metrics.llm_call_seconds.observe(time.perf_counter() - start, kind=kind)
+        if deadline.expired():
+            # Cut off by our own budget, which says nothing about Gemini's health
+            gemini_breaker.release()
+            metrics.llm_calls.inc(kind=kind, outcome="deadline")
+            raise DeadlineExceeded("Request deadline exceeded") from e
+        if getattr(e, "code", None) == 429:
+            # Quota used up despite the limiter (other clients, lower real limits): all workers wait for a refill
+            gemini_limits.drain()
+        gemini_breaker.record_failure()
+        metrics.llm_calls.inc(kind=kind, outcome="error")
+        raise
+    elapsed = time.perf_counter() - start
+    gemini_breaker.record_success(elapsed)
+    metrics.llm_call_seconds.observe(elapsed, kind=kind)
+    metrics.llm_calls.inc(kind=kind, outcome="success")
+    return response
+
+
+def _backoff(kind: str, attempt: int, retries: int) -> bool:
+    """
+    Sleep with jittered exponential backoff before the next attempt.
+
+    Returns:
+        bool: False when no attempt should follow: retries are used up, the
+            circuit is open, or the wait would run past the deadline.
+    """
+    if attempt + 1 >= retries or gemini_breaker.is_open():
+        return False
+    delay = (2 ** attempt) + random.random()
+    left = deadline.remaining()
+    if left is not None and delay >= left:
+        return False
+    metrics.llm_retries.inc(kind=kind)
+    metrics.llm_backoff_seconds.inc(delay, kind=kind)
+    time.sleep(delay)
+    return True
+
+
+def _field_prompt(prompt_instruction: str, content: str) -> str:
+    """Prompt for a single field; also the cache identity of that field."""
+    return (
         f"{prompt_instruction}\n\n"
         f"Content: {content}\n\n"
         f"Return ONLY the improved result. Do not include explanations, notes, or extra text."
     )
 
+
+def enhance_content(prompt_instruction: str, content: str, retries: int = 3) -> str:
+    """
+    Enhances a single piece of content using Gemini API with retry logic.
+    """
+    if not content or not content.strip():
+        return ""
+
+    full_prompt = _field_prompt(prompt_instruction, content)
+
+    cached = _cache_get(full_prompt)
+    if cached is not None:
+        return cached
+
     for attempt in range(retries):
         try:
-            if not model:
+            if not provider.get_model():
                 return content
 
-            response = model.generate_content(full_prompt)
+            response = _generate("field", full_prompt)
             if response and hasattr(response, "text") and response.text:
                 result = response.text.strip()
                 for line in result.split("\n"):
                     if line.strip():
+                        _cache_set(full_prompt, line.strip())
                         return line.strip()
             return content
+        except (CircuitOpenError, DeadlineExceeded):
+            return content
         except Exception as e:
-            print(f"Enhancement attempt {attempt+1} failed: {e}")
-            time.sleep((2 ** attempt) + random.random())
+            logger.warning("Enhancement attempt failed", attempt=attempt + 1, error=str(e))
+            if not _backoff("field", attempt, retries):
+                break
 
     return content
 
@@ -79,12 +212,16 @@ def enhance_batch(prompt_instruction: str, items: list[str], retries: int = 3) -
         f"Return ONLY the improved items as a numbered list, same order, no explanations."
     )
 
+    cached = _cache_get(full_prompt)
+    if cached is not None:
+        return json.loads(cached)
+
     for attempt in range(retries):
         try:
-            if not model:
+            if not provider.get_model():
                 return items
 
-            response = model.generate_content(full_prompt)
+            response = _generate("batch", full_prompt)
             if response and hasattr(response, "text") and response.text:
                 result = response.text.strip()
                 enhanced = []
@@ -94,10 +231,174 @@ def enhance_batch(prompt_instruction: str, items: list[str], retries: int = 3) -
                         # Remove leading numbering like "1. " or "- "
                         cleaned = line.lstrip("0123456789.-) ").strip()
                         enhanced.append(cleaned)
-                return enhanced if enhanced else items
+                # A merged or split line would shift every following item, so only
+                # accept a response that lines up one-to-one with the input
+                if len(enhanced) == len(items):
+                    _cache_set(full_prompt, json.dumps(enhanced))
+                    return enhanced
+                logger.warning("Batch enhancement item count mismatch, keeping originals", returned=len(enhanced), expected=len(items))
+                return items
+            return items
+        except (CircuitOpenError, DeadlineExceeded):
             return items
         except Exception as e:
-            print(f"Batch enhancement attempt {attempt+1} failed: {e}")
-            time.sleep((2 ** attempt) + random.random())
+            logger.warning("Batch enhancement attempt failed", attempt=attempt + 1, error=str(e))
+            if not _backoff("batch", attempt, retries):
+                break
 
     return items
+
+
+def run_concurrently(jobs: list[tuple], max_concurrency: int | None = None) -> list:
+    """
+    Runs independent calls on a bounded thread pool.
+
+    Args:
+        jobs (list[tuple]): (func, args, fallback) tuples.
+        max_concurrency (int | None): Maximum calls in flight, defaults to MAX_CONCURRENCY.
+
+    Returns:
+        list: Results in the same order as jobs. A job that raises yields its fallback.
+    """
+    if not jobs:
+        return []
+
+    limit = max(1, min(max_concurrency or MAX_CONCURRENCY, len(jobs)))
+    results = []
+
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+        futures = [executor.submit(bind_context(func), *args) for func, args, _ in jobs]
+        for future, (_, _, fallback) in zip(futures, jobs):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error("Concurrent enhancement failed", error=str(e))
+                results.append(fallback)
+
+    return results
+
+
+def enhance_many(tasks: list[tuple[str, str]], max_concurrency: int | None = None) -> list[str]:
+    """
+    Enhances several independent pieces of content concurrently.
+
+    Args:
+        tasks (list[tuple[str, str]]): (prompt_instruction, content) pairs.
+        max_concurrency (int | None): Maximum calls in flight, defaults to MAX_CONCURRENCY.
+
+    Returns:
+        list[str]: Enhanced content in the same order as tasks.
+    """
+    return run_concurrently(
+        [(enhance_content, (instruction, content), content) for instruction, content in tasks],
+        max_concurrency,
+    )
+
+
+def enhance_portfolio(fields: dict[str, tuple[str, str]], retries: int = 3) -> dict[str, str]:
+    """
+    Enhances every field of a portfolio in one JSON-schema-constrained request.
+
+    Fields already in the cache are not sent. Results are mapped back by field id;
+    a field missing from the response, or a response that is not valid JSON,
+    falls back to a per-field enhance_content call.
+
+    Args:
+        fields (dict[str, tuple[str, str]]): Field id -> (prompt_instruction, content).
+        retries (int): Number of retry attempts for the combined request.
+
+    Returns:
+        dict[str, str]: Field id -> enhanced content, for every id in fields.
+    """
+    results = {}
+    pending = {}
+    for field_id, (instruction, content) in fields.items():
+        if not content or not content.strip():
+            results[field_id] = ""
+            continue
+        cached = _cache_get(_field_prompt(instruction, content))
+        if cached is not None:
+            results[field_id] = cached
+        else:
+            pending[field_id] = (instruction, content)
+
+    if not pending:
+        return results
+    if not provider.get_model():
+        results.update({field_id: content for field_id, (_, content) in pending.items()})
+        return results
+
+    request_fields = [
+        {"id": field_id, "instruction": instruction, "content": content}
+        for field_id, (instruction, content) in pending.items()
+    ]
+    full_prompt = (
+        "You are improving the content of a professional portfolio.\n"
+        "For each field below, follow its instruction to rewrite its content.\n\n"
+        f"Fields:\n{json.dumps(request_fields, ensure_ascii=False, indent=2)}\n\n"
+        "Return a JSON object mapping every field id to its improved text only, with no explanations."
+    )
+    generation_config = {
+        "response_mime_type": "application/json",
+        "response_schema": {
+            "type": "object",
+            "properties": {field_id: {"type": "string"} for field_id in pending},
+            "required": list(pending),
+        },
+    }
+
+    enhanced = None
+    for attempt in range(retries):
+        try:
+            response = _generate("portfolio", full_prompt, generation_config=generation_config)
+            enhanced = {}
+            if response and hasattr(response, "text") and response.text:
+                enhanced = json.loads(response.text)
+            break
+        except json.JSONDecodeError as e:
+            logger.warning("Portfolio enhancement returned invalid JSON", error=str(e))
+            enhanced = {}
+            break
+        except (CircuitOpenError, DeadlineExceeded):
+            break
+        except Exception as e:
+            logger.warning("Portfolio enhancement attempt failed", attempt=attempt + 1, error=str(e))
+            if not _backoff("portfolio", attempt, retries):
+                break
+
+    if enhanced is None:
+        # The model is unreachable; retrying field by field would only repeat the failure
+        results.update({field_id: content for field_id, (_, content) in pending.items()})
+        return results
+
+    fallback = {}
+    for field_id, (instruction, content) in pending.items():
+        value = enhanced.get(field_id) if isinstance(enhanced, dict) else None
+        if isinstance(value, str) and value.strip():
+            results[field_id] = value.strip()
+            _cache_set(_field_prompt(instruction, content), value.strip())
+        else:
+            fallback[field_id] = (instruction, content)
+
+    if fallback:
+        logger.info("Falling back to per-field enhancement", fields=list(fallback))
+        results.update(zip(fallback, enhance_many(list(fallback.values()))))
+
+    return {field_id: results[field_id] for field_id in fields}
+
+
+def enhance_fields(fields: dict[str, tuple[str, str]], mode: str | None = None) -> dict[str, str]:
+    """
+    Enhances a set of named fields using the configured strategy.
+
+    Args:
+        fields (dict[str, tuple[str, str]]): Field id -> (prompt_instruction, content).
+        mode (str | None): "portfolio" for one combined request, "fields" for one
+            concurrent call per field. Defaults to ENHANCE_MODE.
+
+    Returns:
+        dict[str, str]: Field id -> enhanced content, for every id in fields.
+    """
+    if (mode or ENHANCE_MODE) == "portfolio":
+        return enhance_portfolio(fields)
+    return dict(zip(fields, enhance_many(list(fields.values()))))
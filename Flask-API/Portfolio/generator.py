@@ -1,6 +1,12 @@
-import os
-from jinja2 import Environment, FileSystemLoader
-from .enhancer import enhance_content, enhance_batch
+from . import artifacts, assets, snapshots
+from .enhancer import MODEL_NAME
+from .logs import get_logger
+from .registry import templates
+from .renderer import get_template, template_version
+
+logger = get_logger(__name__)
+
+TEMPLATE_FILE = "template_portfolio.txt"
 
 
 def generate_portfolio(data: dict) -> str:
@@ -12,13 +18,20 @@ def generate_portfolio(data: dict) -> str:
     
     Returns:
         str: Path to the generated portfolio HTML file.
+
+    Raises:
+        schema.ValidationError: If data does not match the default field spec.
     """
 
-    # ✅ Enhance single fields
-    enhanced_about = enhance_content(
-        "Transform this into a compelling professional bio (2-3 sentences):",
-        data.get("about", "")
-    )
+    # ✅ Check the input and bring it into canonical shape before any Gemini call
+    data = templates.validator()(data)
+
+    # ✅ Reuse the stored artifact for an identical submission; only fully enhanced pages are stored under its id
+    artifact = artifacts.artifact_id(TEMPLATE_FILE, data, MODEL_NAME, str(template_version(TEMPLATE_FILE)), assets.manifest_version())
+    existing = artifacts.find(artifact)
+    if existing:
+        with open(existing, encoding="utf-8") as f:
+            return f.read()
 
     # ✅ Generate skills based on GitHub projects
     def generate_skills_from_projects(projects):
@@ -58,89 +71,76 @@ def generate_portfolio(data: dict) -> str:
         enhanced_skills = generate_skills_from_projects(raw_projects)
     else:
         # Fallback to manual skills if no projects
-        skills_data = data.get("skills", "")
-        if isinstance(skills_data, str):
-            raw_skills = [s.strip() for s in skills_data.split(",") if s.strip()]
-        else:
-            raw_skills = skills_data if isinstance(skills_data, list) else []
-        enhanced_skills = [{"name": skill, "percentage": 80} for skill in raw_skills] if raw_skills else []
-
-    # ✅ Enhance project descriptions (batch)
-    raw_projects = data.get("projects", [])
-    project_descriptions = [p.get("description", "") for p in raw_projects if p.get("description")]
-    enhanced_project_descriptions = enhance_batch(
-        "Rewrite each project description professionally. Highlight technologies, features, and impact:",
-        project_descriptions
-    )
+        enhanced_skills = [{"name": skill["name"], "percentage": skill.get("percentage", 80)} for skill in data.get("skills", []) if skill.get("name")]
+
+    # ✅ Collect every enhanceable field under a stable id
+    valid_certs = data.get("certifications", [])
+    achievement_texts = data.get("achievements", [])
+
+    raw_education = f"{data.get('degree', '')} - {data.get('collegeName', '')}, {data.get('yearOfPassing', '')}"
+    raw_experiences = data.get("experience", [])
+
+    fields = {
+        "about": ("Transform this into a compelling professional bio (2-3 sentences):", data.get("about", "")),
+        "education": ("Enhance this education information to be more descriptive and professional:", raw_education),
+    }
+    for i, project in enumerate(raw_projects):
+        if project.get("description"):
+            fields[f"project_{i}"] = (
+                "Rewrite this project description professionally. Highlight technologies, features, and impact:",
+                project["description"],
+            )
+    for i, cert in enumerate(valid_certs):
+        fields[f"certification_{i}"] = (
+            "Provide a detailed description for this certification including what skills it validates and its industry value:",
+            cert,
+        )
+    for i, text in enumerate(achievement_texts):
+        fields[f"achievement_{i}"] = (
+            "Transform this achievement into a compelling professional accomplishment with specific details and impact:",
+            text,
+        )
+    for i, exp in enumerate(raw_experiences):
+        if exp.get("role"):
+            fields[f"experience_{i}"] = (
+                "Create a detailed professional job description with specific responsibilities, technologies used, and key achievements. Include 3-4 bullet points of what this role involves:",
+                f"{exp.get('role', '')} at {exp.get('companyName', '')}",
+            )
+
+    # ✅ Enhance only what changed since this portfolio was last generated and map the results back by id
+    enhanced = snapshots.enhance_changed(snapshots.portfolio_key(data, TEMPLATE_FILE), fields)
+    raw_fields = [field_id for field_id, (_, content) in fields.items() if content.strip() and enhanced.get(field_id) == content]
+    if raw_fields:
+        # A degraded page gets its own id so the next identical submission tries Gemini again
+        logger.warning("Fields kept as submitted", raw_fields=raw_fields)
+        artifact = artifacts.artifact_id(TEMPLATE_FILE, {"artifact": artifact, "raw_fields": raw_fields}, "partial")
+    enhanced_about = enhanced["about"]
+    enhanced_education = enhanced["education"]
+    enhanced_certs = [enhanced[f"certification_{i}"] for i in range(len(valid_certs))]
+    enhanced_achievements = [enhanced[f"achievement_{i}"] for i in range(len(achievement_texts))]
+    logger.debug("Final enhanced achievements", achievements=enhanced_achievements)
+
     enhanced_projects = [
         {
-            "name": raw_projects[i].get("name", ""),
-            "description": enhanced_project_descriptions[i] if i < len(enhanced_project_descriptions) else raw_projects[i].get("description", ""),
-            "url": raw_projects[i].get("url", ""),
-            "language": raw_projects[i].get("language", ""),
-            "stars": raw_projects[i].get("stars", 0),
-            "forks": raw_projects[i].get("forks", 0),
+            "name": project.get("name", ""),
+            "description": enhanced.get(f"project_{i}", project.get("description", "")),
+            "url": project.get("url", ""),
+            "language": project.get("language", ""),
+            "stars": project.get("stars", 0),
+            "forks": project.get("forks", 0),
         }
-        for i in range(len(raw_projects))
+        for i, project in enumerate(raw_projects)
     ]
 
-    # ✅ Enhance certifications (batch)
-    raw_certs = data.get("certifications", [])
-    # Filter out empty strings and ensure we have valid certification data
-    valid_certs = [cert for cert in raw_certs if cert and isinstance(cert, str) and cert.strip()]
-    enhanced_certs = enhance_batch(
-        "Provide detailed descriptions for these certifications including what skills they validate and their industry value:",
-        valid_certs
-    ) if valid_certs else []
-    
-    # ✅ Enhance achievements
-    raw_achievements = data.get("achievements", [])
-    print(f"Raw achievements data: {raw_achievements}")
-    print(f"Raw achievements type: {type(raw_achievements)}")
-    
-    # Handle different data formats
-    if isinstance(raw_achievements, str):
-        # If it's a string, split by comma or newline
-        raw_achievements = [a.strip() for a in raw_achievements.replace('\n', ',').split(',') if a.strip()]
-    elif not isinstance(raw_achievements, list):
-        raw_achievements = []
-    
-    enhanced_achievements = []
-    for achievement in raw_achievements:
-        print(f"Processing achievement: {achievement}, type: {type(achievement)}")
-        # Convert to string if it's not already
-        achievement_str = str(achievement).strip() if achievement else ""
-        if achievement_str:
-            enhanced_desc = enhance_content(
-                "Transform this achievement into a compelling professional accomplishment with specific details and impact:",
-                achievement_str
-            )
-            enhanced_achievements.append(enhanced_desc)
-        else:
-            print(f"Achievement filtered out: {achievement}")
-    print(f"Final enhanced achievements: {enhanced_achievements}")
-
-    # ✅ Enhance education
-    raw_education = f"{data.get('degree', '')} - {data.get('collegeName', '')}, {data.get('yearOfPassing', '')}"
-    enhanced_education = enhance_content(
-        "Enhance this education information to be more descriptive and professional:",
-        raw_education
-    )
-
-    # ✅ Enhance experience descriptions
-    raw_experiences = data.get("experiences", [])
-    enhanced_experiences = []
-    for exp in raw_experiences:
-        enhanced_desc = enhance_content(
-            "Create a detailed professional job description with specific responsibilities, technologies used, and key achievements. Include 3-4 bullet points of what this role involves:",
-            f"{exp.get('role', '')} at {exp.get('companyName', '')}"
-        ) if exp.get('role') else ""
-        enhanced_experiences.append({
+    enhanced_experiences = [
+        {
             "role": exp.get("role", ""),
             "companyName": exp.get("companyName", ""),
             "duration": exp.get("duration", ""),
-            "description": enhanced_desc
-        })
+            "description": enhanced.get(f"experience_{i}", "")
+        }
+        for i, exp in enumerate(raw_experiences)
+    ]
 
     # ✅ Build enhanced data dict
     enhanced_data = {
@@ -158,17 +158,13 @@ def generate_portfolio(data: dict) -> str:
         "achievements": enhanced_achievements,
     }
 
-    # ✅ Jinja2 setup
-    env = Environment(loader=FileSystemLoader("Portfolio/templates"))
-    template = env.get_template("template_portfolio.html")
+    # ✅ Shared compiled template
+    template = get_template(TEMPLATE_FILE)
 
     # ✅ Render HTML
     html_content = template.render(**enhanced_data)
 
-    # ✅ Save to output folder
-    os.makedirs("output", exist_ok=True)
-    output_path = os.path.join("output", "portfolio.html")
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    # ✅ Save to the artifact store
+    artifacts.save(artifact, html_content)
 
     return html_content
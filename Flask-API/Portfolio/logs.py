@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+import copy
+import queue
+import random
+import atexit
+import logging
+import threading
+import functools
+import contextvars
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from . import metrics
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# "json" for one object per line, "text" for a human-readable line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Records waiting for the writer thread; when full, new records are dropped instead of blocking
+QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Bounds on what a single record can carry, whatever the size of the value logged
+MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "500"))
+MAX_ITEMS = int(os.getenv("LOG_MAX_ITEMS", "20"))
+MAX_DEPTH = int(os.getenv("LOG_MAX_DEPTH", "3"))
+MAX_MESSAGE_CHARS = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000"))
+
+# Fraction of debug_payload() calls that are logged when DEBUG is enabled
+PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+
+# Keys whose values never reach the log (compared lowercase, ignoring "-" and "_")
+REDACT_FIELDS = {
+    name.strip().lower().replace("-", "").replace("_", "")
+    for name in os.getenv(
+        "LOG_REDACT_FIELDS",
+        "email,mobile,phone,password,token,secret,apikey,authorization,cookie,accesstoken,githubtoken",
+    ).split(",")
+    if name.strip()
+}
+
+# Correlation id of the request being handled, attached to every record logged under it
+request_id = contextvars.ContextVar("request_id", default=None)
+
+_listener = None
+_listener_lock = threading.Lock()
+_queue = None
+
+
+def _redacted(key) -> bool:
+    return str(key).lower().replace("-", "").replace("_", "") in REDACT_FIELDS
+
+
+def summarize(value, depth: int = MAX_DEPTH):
+    """
+    A JSON-safe copy of value with bounded size: long strings are cut to
+    MAX_FIELD_CHARS, containers to MAX_ITEMS entries and nesting to MAX_DEPTH,
+    and sensitive keys are redacted. The work done never depends on how big
+    value is.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) > MAX_FIELD_CHARS:
+            return f"{value[:MAX_FIELD_CHARS]}...({len(value)} chars)"
+        return value
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"<dict with {len(value)} keys>"
+        result = {}
+        for i, (key, item) in enumerate(value.items()):
+            if i >= MAX_ITEMS:
+                result["..."] = f"{len(value) - MAX_ITEMS} more keys"
+                break
+            result[str(key)[:100]] = "[REDACTED]" if _redacted(key) else summarize(item, depth - 1)
+        return result
+    if isinstance(value, (list, tuple, set)):
+        if depth <= 0:
+            return f"<{type(value).__name__} of {len(value)} items>"
+        items = []
+        for i, item in enumerate(value):
+            if i >= MAX_ITEMS:
+                items.append(f"...{len(value) - MAX_ITEMS} more items")
+                break
+            items.append(summarize(item, depth - 1))
+        return items
+    return summarize(repr(value)[:MAX_FIELD_CHARS + 1], depth)
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    Logger whose keyword arguments become structured fields of the record:
+
+        logger.info("Portfolio generated", template=name, cached=False)
+
+    Field values pass through summarize() on the calling thread, so a record
+    never holds a reference to mutable request data.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def log(self, level, msg, *args, exc_info=None, **fields):
+        if self.isEnabledFor(level):
+            extra = {"fields": {key: "[REDACTED]" if _redacted(key) else summarize(value) for key, value in fields.items()}}
+            self.logger.log(level, msg, *args, exc_info=exc_info, extra=extra)
+
+    def debug(self, msg, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        self.log(logging.ERROR, msg, *args, exc_info=exc_info, **kwargs)
+
+    def debug_payload(self, msg, payload, **fields):
+        """Log a (summarized) request payload at DEBUG for a PAYLOAD_SAMPLE_RATE sample of calls."""
+        if self.isEnabledFor(logging.DEBUG) and random.random() < PAYLOAD_SAMPLE_RATE:
+            self.log(logging.DEBUG, msg, payload=payload, **fields)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(name))
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the writer thread; never blocks and never formats payloads."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        message = record.getMessage()
+        record.msg = message if len(message) <= MAX_MESSAGE_CHARS else f"{message[:MAX_MESSAGE_CHARS]}...({len(message)} chars)"
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))[-MAX_MESSAGE_CHARS:]
+            record.exc_info = None
+        record.request_id = request_id.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.log_records_dropped.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = f"{self.formatTime(record)} {record.levelname} {record.name}: {record.getMessage()}"
+        if getattr(record, "request_id", None):
+            line += f" [request_id={record.request_id}]"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={json.dumps(value, ensure_ascii=False, default=str)}" for key, value in fields.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+def _start_listener():
+    global _listener, _queue
+    _queue = queue.Queue(maxsize=QUEUE_SIZE)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+    _listener = QueueListener(_queue, stream, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _NonBlockingQueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(_NonBlockingQueueHandler(_queue))
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure():
+    """
+    Route all logging through a bounded queue to a writer thread that emits to stdout.
+
+    Safe to call more than once. A forked worker starts its own writer thread,
+    since the parent's does not survive the fork.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        logging.getLogger().setLevel(LOG_LEVEL)
+        _start_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_start_listener)
+
+
+def bind_context(func):
+    """
+    Wrap func to run in a copy of the current context, so work handed to a
+    thread pool keeps the request id (and other context variables) of the
+    code that submitted it.
+    """
+    return functools.partial(contextvars.copy_context().run, func)
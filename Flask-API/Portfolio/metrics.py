@@ -0,0 +1,169 @@
+import time
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+# Upper bounds (seconds) for latency histograms; LLM calls and retries can take tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(ABC):
+    """Base for metrics keyed by label values; registers itself for render()."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Exposition lines for every label set, without HELP/TYPE."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. calls made or cache hits."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    """A value that can go up and down, e.g. remaining rate-limit budget."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the enclosed block took, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labels, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format.
+
+    Values are per process; with several workers, scrape each one or
+    aggregate them in Prometheus.
+    """
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# Pipeline and HTTP
+stage_seconds = Histogram("portfolio_stage_seconds", "Time spent in each generation/preview stage", ("stage",))
+http_request_seconds = Histogram(
+    "portfolio_http_request_seconds", "HTTP request latency by route", ("method", "endpoint", "status")
+)
+
+# Gemini
+llm_calls = Counter("portfolio_llm_calls_total", "Gemini generate_content calls", ("kind", "outcome"))
+llm_call_seconds = Histogram("portfolio_llm_call_seconds", "Gemini generate_content latency", ("kind",))
+llm_retries = Counter("portfolio_llm_retries_total", "Gemini calls retried after a failure", ("kind",))
+llm_backoff_seconds = Counter("portfolio_llm_backoff_seconds_total", "Time slept between Gemini retries", ("kind",))
+llm_queue_seconds = Histogram("portfolio_llm_queue_seconds", "Time Gemini calls waited for rate-limit budget", ("priority",))
+llm_coalesced = Counter("portfolio_llm_coalesced_total", "Gemini calls answered by an identical call already in flight", ("kind",))
+
+# Circuit breakers
+circuit_state = Gauge("portfolio_circuit_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open", ("breaker",))
+circuit_transitions = Counter("portfolio_circuit_transitions_total", "Circuit breaker state changes", ("breaker", "to"))
+circuit_rejected = Counter("portfolio_circuit_rejected_total", "Calls failed fast because the circuit was open", ("breaker",))
+
+# Input validation
+validation_failures = Counter("portfolio_validation_failures_total", "Submissions rejected by their template's field spec", ("template",))
+
+# Caches (enhancements, github, jobs, artifacts, preview)
+cache_requests = Counter("portfolio_cache_requests_total", "Cache lookups by result", ("cache", "result"))
+
+# GitHub
+github_requests = Counter("portfolio_github_requests_total", "GitHub API requests by endpoint type and result", ("endpoint", "result"))
+github_request_seconds = Histogram("portfolio_github_request_seconds", "GitHub API request latency", ("endpoint",))
+github_rate_limit_remaining = Gauge("portfolio_github_rate_limit_remaining", "X-RateLimit-Remaining from the last GitHub response")
+github_rate_limit_reset = Gauge("portfolio_github_rate_limit_reset_timestamp", "X-RateLimit-Reset from the last GitHub response")
+
+# Startup
+cold_start_seconds = Gauge("portfolio_cold_start_seconds", "Time spent creating the app, by warm-up step and in total", ("step",))
+
+# Logging
+log_records_dropped = Counter("portfolio_log_records_dropped_total", "Log records dropped because the log queue was full")
@@ -0,0 +1,76 @@
+import os
+import threading
+from dotenv import load_dotenv
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
+
+
+class GeminiProvider:
+    """
+    Builds the Gemini model on first use and hands the same instance to every caller.
+
+    Importing google.generativeai and opening its transport is the slowest part
+    of starting a worker, so nothing happens until get_model() is first called
+    (from a request or from warm-up). A forked child drops the parent's model
+    and builds its own, since gRPC channels cannot be shared across a fork.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME):
+        self.model_name = model_name
+        self._model = None
+        self._loaded = False
+        self._pinned = False
+        self._lock = threading.Lock()
+
+    def get_model(self):
+        """Return the configured model, or None if Gemini is not configured."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._model = self._load()
+                    self._loaded = True
+        return self._model
+
+    def _load(self):
+        try:
+            import google.generativeai as genai
+
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("GEMINI_API_KEY not found in environment variables.")
+            # GEMINI_API_ENDPOINT points the client at another host, e.g. a local stand-in for load tests
+            api_endpoint = os.getenv("GEMINI_API_ENDPOINT")
+            if api_endpoint:
+                genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": api_endpoint})
+            else:
+                genai.configure(api_key=api_key)
+            return genai.GenerativeModel(self.model_name)
+        except Exception as e:
+            logger.error("Error initializing Gemini model", error=str(e))
+            return None
+
+    def set_model(self, model):
+        """Use the given model instead of loading one, e.g. a stub in benchmarks."""
+        with self._lock:
+            self._model = model
+            self._loaded = True
+            self._pinned = True
+
+    def reset(self):
+        """Forget a loaded (not pinned) model so the next get_model() builds a new one."""
+        self._lock = threading.Lock()
+        if not self._pinned:
+            self._model = None
+            self._loaded = False
+
+
+provider = GeminiProvider()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=provider.reset)
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import threading
+from .logs import get_logger
+from .schema import Validator
+
+logger = get_logger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Template files, and the metadata (file, description, fields) of the templates the API offers;
+# DEFAULT_SECTION holds the fields of templates that do not list their own
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+REQUIREMENTS_FILE = os.getenv("TEMPLATE_REQUIREMENTS_FILE", os.path.join(BASE_DIR, "template_data_requirements.json"))
+DEFAULT_SECTION = "Default_Requirements"
+
+# Seconds between checks of the templates directory and requirements file for changes; 0 turns hot reload off
+RELOAD_INTERVAL = float(os.getenv("TEMPLATE_RELOAD_INTERVAL", "2"))
+
+
+class TemplateRegistry:
+    """
+    Every template the API offers, indexed by name.
+
+    Built from template_data_requirements.json and the templates directory on
+    first use. Afterwards a lookup re-stats the files at most every
+    `reload_interval` seconds and reloads the index if any of them changed, so
+    requests never probe the filesystem themselves. `generation` goes up on
+    every reload, for caches derived from the templates. Each entry carries
+    its field spec compiled into a schema.Validator under "validate".
+
+    Entries are shared; callers must not modify them.
+    """
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR, requirements_file: str = REQUIREMENTS_FILE,
+                 reload_interval: float = RELOAD_INTERVAL):
+        self.template_dir = template_dir
+        self.requirements_file = requirements_file
+        self.reload_interval = reload_interval
+        self.generation = 0
+        self._by_name = {}
+        self._default = Validator({"name": "string"}, {})
+        self._versions = {}
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _scan(self) -> tuple:
+        """(name, mtime, size) of every template file, and of the requirements file."""
+        entries = []
+        try:
+            for entry in os.scandir(self.template_dir):
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_mtime, stat.st_size))
+        except OSError as e:
+            logger.error("Templates directory unreadable", path=self.template_dir, error=str(e))
+        try:
+            stat = os.stat(self.requirements_file)
+            entries.append((self.requirements_file, stat.st_mtime, stat.st_size))
+        except OSError:
+            pass
+        return tuple(sorted(entries))
+
+    def _load(self, signature: tuple):
+        versions = {name: mtime for name, mtime, _ in signature if name != self.requirements_file}
+        try:
+            with open(self.requirements_file, encoding="utf-8") as f:
+                sections = json.load(f)
+        except (OSError, ValueError) as e:
+            # Keep serving the last good index, e.g. while the file is half-written
+            logger.error("Template requirements unreadable", path=self.requirements_file, error=str(e))
+            sections = None
+
+        if sections is not None:
+            default = sections.get(DEFAULT_SECTION) or {}
+            by_name = {}
+            for section in sections.values():
+                if not isinstance(section, dict) or not section.get("templateName") or not section.get("file"):
+                    continue
+                fields = section if "required_fields" in section or "optional_fields" in section else default
+                required, optional = fields.get("required_fields") or {}, fields.get("optional_fields") or {}
+                by_name[section["templateName"]] = {
+                    "name": section["templateName"],
+                    "file": section["file"],
+                    "description": section.get("description", ""),
+                    "required_fields": list(required),
+                    "optional_fields": list(optional),
+                    "available": section["file"] in versions,
+                    "validate": Validator(required, optional),
+                }
+            self._by_name = by_name
+            self._default = Validator(default.get("required_fields") or {"name": "string"}, default.get("optional_fields") or {})
+        self._versions = versions
+        self.generation += 1
+        logger.info("Template registry loaded", templates=list(self._by_name), generation=self.generation)
+
+    def refresh(self):
+        """Reload if any template or the requirements file changed; checks at most every reload_interval."""
+        if self._signature is not None and (
+            self.reload_interval <= 0 or time.monotonic() - self._checked_at < self.reload_interval
+        ):
+            return
+        with self._lock:
+            if self._signature is not None and time.monotonic() - self._checked_at < self.reload_interval:
+                return
+            signature = self._scan()
+            self._checked_at = time.monotonic()
+            if signature != self._signature:
+                self._load(signature)
+                self._signature = signature
+
+    def get(self, name: str) -> dict | None:
+        """The template offered under name, or None."""
+        self.refresh()
+        return self._by_name.get(name)
+
+    def all(self) -> list[dict]:
+        """Every offered template, in the order of the requirements file."""
+        self.refresh()
+        return list(self._by_name.values())
+
+    def names(self) -> list[str]:
+        self.refresh()
+        return list(self._by_name)
+
+    def validator(self, name: str | None = None) -> Validator:
+        """Compiled field spec of the named template, or the default spec for None or unknown names."""
+        self.refresh()
+        template = self._by_name.get(name)
+        return template["validate"] if template else self._default
+
+    def version(self, template_file: str) -> float | None:
+        """Modification time of a template file when last scanned, so derived caches change when it does."""
+        self.refresh()
+        return self._versions.get(template_file)
+
+
+templates = TemplateRegistry()
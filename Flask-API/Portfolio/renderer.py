@@ -0,0 +1,110 @@
+import os
+import threading
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from .assets import asset_url, optimized_url
+from .logs import get_logger
+from .registry import TEMPLATE_DIR, templates
+
+logger = get_logger(__name__)
+
+# Compiled bytecode survives restarts; override the location with TEMPLATE_CACHE_DIR
+CACHE_DIR = os.getenv(
+    "TEMPLATE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "jinja"),
+)
+
+# Number of template events grouped into each streamed chunk
+STREAM_BUFFER = int(os.getenv("TEMPLATE_STREAM_BUFFER", "32"))
+
+_env = None
+_env_lock = threading.Lock()
+_generation = None
+
+
+def get_environment() -> Environment:
+    """
+    Return the process-wide Jinja2 environment, creating it on first use.
+
+    The environment keeps compiled templates in memory without checking the
+    files on each lookup; get_template() drops them when the template
+    registry sees a change on disk.
+    """
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                bytecode_cache = None
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    bytecode_cache = FileSystemBytecodeCache(CACHE_DIR)
+                except OSError as e:
+                    logger.warning("Template bytecode cache disabled", error=str(e))
+                env = Environment(
+                    loader=FileSystemLoader(TEMPLATE_DIR),
+                    bytecode_cache=bytecode_cache,
+                    auto_reload=False,
+                )
+                # Templates link static files through their fingerprinted builds
+                env.globals["asset_url"] = asset_url
+                env.globals["optimized_url"] = optimized_url
+                _env = env
+    return _env
+
+
+def _current_environment() -> Environment:
+    """The shared environment, emptied of compiled templates if they changed on disk since last use."""
+    global _generation
+    env = get_environment()
+    templates.refresh()
+    if _generation != templates.generation:
+        with _env_lock:
+            if _generation != templates.generation:
+                if env.cache is not None:
+                    env.cache.clear()
+                _generation = templates.generation
+    return env
+
+
+def get_template(template_file: str):
+    """Get a compiled template from the shared registry."""
+    return _current_environment().get_template(template_file)
+
+
+def template_version(template_file: str) -> float | None:
+    """Modification time of a template file, so derived caches change when it does."""
+    return templates.version(template_file)
+
+
+def render_template(template_file: str, data: dict) -> str:
+    """Render a template from the shared registry with the given data."""
+    return get_template(template_file).render(**data)
+
+
+def stream_template(template_file: str, data: dict, buffer_size: int = STREAM_BUFFER):
+    """
+    Render a template incrementally, yielding HTML chunks as they are produced.
+
+    Small template events are grouped into chunks of `buffer_size` so the
+    server is not flushing a few bytes at a time.
+    """
+    stream = get_template(template_file).stream(**data)
+    stream.enable_buffering(size=buffer_size)
+    return stream
+
+
+def precompile_templates() -> list[str]:
+    """
+    Compile every template in the templates directory into the shared registry.
+
+    Returns:
+        list[str]: Names of the templates that were loaded.
+    """
+    env = _current_environment()
+    loaded = []
+    for name in env.list_templates():
+        try:
+            env.get_template(name)
+            loaded.append(name)
+        except Exception as e:
+            logger.error("Error precompiling template", template=name, error=str(e))
+    return loaded
@@ -0,0 +1,230 @@
+import os
+import time
+import heapq
+import sqlite3
+import itertools
+import threading
+import contextvars
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from . import deadline, metrics
+from .cache import DEFAULT_DB_PATH
+from .deadline import DeadlineExceeded
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+# Priority classes; lower values are admitted first
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Longest a queued call sleeps before looking at the shared budget again,
+# since other workers take from and refill it without notifying this one
+MAX_POLL_SECONDS = 0.5
+
+# Priority of the calls made by the current request or job
+priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority_scope(value: int):
+    """Run the enclosed block with calls scheduled at the given priority class."""
+    token = priority.set(value)
+    try:
+        yield
+    finally:
+        priority.reset(token)
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token cost of a call: about four characters per token, with a response as long as the prompt."""
+    return 2 * (len(prompt) // 4 + 1)
+
+
+class SharedTokenBucket:
+    """
+    Per-minute limits (e.g. requests and tokens) as token buckets in a SQLite
+    table, so every worker process draws from the same budget.
+
+    Each bucket holds up to its limit and refills at limit/60 per second.
+    Storage errors let calls through: a broken store behaves like no limit.
+    """
+
+    def __init__(self, name: str, limits: dict[str, float], path: str | None = None):
+        self.name = name
+        # A limit of 0 or less is not enforced
+        self.limits = {limit: value for limit, value in limits.items() if value > 0}
+        self.path = path or DEFAULT_DB_PATH
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def take(self, costs: dict[str, float], reserve: float = 0.0) -> float:
+        """
+        Take every cost from its bucket at once, or nothing.
+
+        Args:
+            costs (dict[str, float]): Limit name -> amount the call uses.
+            reserve (float): Fraction of each limit that must remain afterwards.
+
+        Returns:
+            float: 0 if taken, else seconds until enough will have refilled.
+        """
+        if not self.limits:
+            return 0.0
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                wait = 0.0
+                levels = {}
+                for limit, value in self.limits.items():
+                    key = f"{self.name}:{limit}"
+                    row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE name = ?", (key,)).fetchone()
+                    rate = value / 60
+                    tokens = value if row is None else min(value, row[0] + max(0.0, now - row[1]) * rate)
+                    # A call larger than the whole budget waits for a full bucket rather than forever
+                    cost = min(costs.get(limit, 0), value * (1 - reserve))
+                    shortfall = cost + value * reserve - tokens
+                    if shortfall > 0:
+                        wait = max(wait, shortfall / rate)
+                    levels[key] = tokens - cost
+                if wait == 0:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                        [(key, tokens, now) for key, tokens in levels.items()],
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return wait
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Rate limiter unavailable", limiter=self.name, error=str(e))
+            return 0.0
+
+    def drain(self):
+        """Empty every bucket, e.g. after the upstream reported its quota used up."""
+        try:
+            now = time.time()
+            self._connect().executemany(
+                "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, 0, ?)",
+                [(f"{self.name}:{limit}", now) for limit in self.limits],
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Rate limiter unavailable", limiter=self.name, error=str(e))
+
+
+class Scheduler:
+    """
+    Admits calls to a rate-limited API against a SharedTokenBucket.
+
+    Within a process, waiting calls are admitted by priority class and then
+    in arrival order. Across processes, BULK calls may not dip into the last
+    `bulk_reserve` fraction of each budget, which is kept for INTERACTIVE
+    calls. Identical calls (same key) already in flight in this process share
+    one upstream request.
+    """
+
+    def __init__(self, bucket: SharedTokenBucket, bulk_reserve: float = 0.0):
+        self.bucket = bucket
+        self.bulk_reserve = bulk_reserve
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def acquire(self, cost: int, level: int = INTERACTIVE):
+        """
+        Block until a call of `cost` tokens may be made.
+
+        Raises:
+            DeadlineExceeded: If the wait would outlast the current deadline.
+        """
+        start = time.perf_counter()
+        ticket = (level, next(self._sequence))
+        reserve = self.bulk_reserve if level > INTERACTIVE else 0.0
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    needed = 0.0
+                    if self._waiting[0] == ticket:
+                        needed = self.bucket.take({"requests": 1, "tokens": cost}, reserve)
+                        if needed == 0:
+                            return
+                    wait = min(MAX_POLL_SECONDS, needed or MAX_POLL_SECONDS)
+                    left = deadline.remaining()
+                    if left is not None and (left <= 0 or needed > left):
+                        raise DeadlineExceeded("Rate limit wait would outlast the request deadline")
+                    self._cond.wait(wait if left is None else min(wait, left))
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                metrics.llm_queue_seconds.observe(time.perf_counter() - start, priority=PRIORITY_NAMES.get(level, level))
+
+    def run(self, kind: str, key: str, cost: int, call):
+        """
+        Make call() once the limits allow, at the current priority, or wait
+        for the result of an identical call already in flight.
+
+        Args:
+            kind (str): Call type for metrics.
+            key (str): Identity of the call; equal keys must mean equal results.
+            cost (int): Estimated tokens the call uses.
+            call: Function making the upstream request.
+
+        Raises:
+            DeadlineExceeded: If the result is not ready by the current deadline.
+        """
+        while True:
+            with self._in_flight_lock:
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._in_flight[key] = Future()
+
+            if leader:
+                try:
+                    self.acquire(cost, priority.get())
+                    future.set_result(call())
+                except Exception as e:
+                    future.set_exception(e)
+                finally:
+                    with self._in_flight_lock:
+                        del self._in_flight[key]
+                    if not future.done():
+                        future.cancel()
+                return future.result()
+
+            metrics.llm_coalesced.inc(kind=kind)
+            try:
+                return future.result(timeout=deadline.remaining())
+            except DeadlineExceeded:
+                # The leader ran out of its own time budget; try again within ours
+                if deadline.expired():
+                    raise
+            except FutureTimeoutError:
+                raise DeadlineExceeded("Request deadline exceeded waiting for an identical call")
@@ -0,0 +1,191 @@
+"""
+Validation and normalization of portfolio input.
+
+The field specs in template_data_requirements.json are compiled once per
+template into a Validator. It rejects malformed input before any GitHub or
+Gemini call is made, and returns the input in one canonical shape:
+
+- strings are stripped, numbers given for strings become strings
+- lists may be given as comma- or newline-separated strings
+- list items given as strings fill the first field of an object item
+  (a skill "Python" becomes {"name": "Python"}); that field is required
+- numbers whose spec gives a range ("0-100") must lie within it
+- empty values are left out, so {"email": ""} and {} are the same input
+- old field names are renamed (experiences -> experience)
+
+Templates and cache keys only ever see the canonical shape. Fields the spec
+does not mention are passed through unchanged.
+"""
+import re
+import math
+
+# Older names of fields, mapped to their canonical name
+ALIASES = {"experiences": "experience"}
+
+_SEPARATORS = re.compile(r"[,\n]")
+_RANGE = re.compile(r"(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)")
+_MISSING = object()
+
+
+class ValidationError(ValueError):
+    """Input that does not match a template's field spec; `errors` lists every problem found."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _split(text: str) -> list[str]:
+    return [part.strip() for part in _SEPARATORS.split(text) if part.strip()]
+
+
+def _string(value, path, errors):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        errors.append(f"{path} must be a string")
+        return _MISSING
+    return str(value).strip() or _MISSING
+
+
+def _number(value, path, errors):
+    if isinstance(value, str):
+        if not value.strip():
+            return _MISSING
+        try:
+            value = float(value.strip().rstrip("%"))
+        except ValueError:
+            pass
+        else:
+            value = int(value) if value.is_integer() else value
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        errors.append(f"{path} must be a number")
+        return _MISSING
+    return value
+
+
+def _bounded(low: float, high: float):
+    def check(value, path, errors):
+        value = _number(value, path, errors)
+        if value is not _MISSING and not low <= value <= high:
+            errors.append(f"{path} must be between {low:g} and {high:g}")
+            return _MISSING
+        return value
+
+    return check
+
+
+def _text_item(value, path, errors):
+    # {"name": ..., "description": ...} items, as some clients send achievements
+    if isinstance(value, dict) and value.get("name"):
+        value = f"{value['name']}: {value['description']}" if value.get("description") else value["name"]
+    return _string(value, path, errors)
+
+
+def _object(fields: dict):
+    first = next(iter(fields), None)
+
+    def check(value, path, errors):
+        if isinstance(value, str) and first is not None:
+            value = {first: value}
+        if not isinstance(value, dict):
+            errors.append(f"{path} must be an object")
+            return _MISSING
+        result = {key: item for key, item in value.items() if key not in fields}
+        for name, field in fields.items():
+            if value.get(name) is not None:
+                checked = field(value[name], f"{path}.{name}", errors)
+                if checked is not _MISSING:
+                    result[name] = checked
+        if not any(name in result for name in fields):
+            # An empty row, e.g. a blank form entry
+            return _MISSING
+        if first not in result:
+            errors.append(f"{path}.{first} is required")
+            return _MISSING
+        return result
+
+    return check
+
+
+def _list_of(item):
+    def check(value, path, errors):
+        if isinstance(value, str):
+            value = _split(value)
+        if not isinstance(value, list):
+            errors.append(f"{path} must be a list")
+            return _MISSING
+        result = []
+        for i, entry in enumerate(value):
+            if entry is not None:
+                checked = item(entry, f"{path}[{i}]", errors)
+                if checked is not _MISSING:
+                    result.append(checked)
+        return result or _MISSING
+
+    return check
+
+
+def _compile(spec):
+    """Checker for one field spec: "string - ...", "number - ... [low-high]", [item spec] or {field: spec}."""
+    if isinstance(spec, list):
+        item = _compile(spec[0]) if spec else _string
+        return _list_of(_text_item if item is _string else item)
+    if isinstance(spec, dict):
+        return _object({name: _compile(field) for name, field in spec.items()})
+    if str(spec).startswith("number"):
+        bounds = _RANGE.search(str(spec))
+        return _bounded(float(bounds.group(1)), float(bounds.group(2))) if bounds else _number
+    return _string
+
+
+class Validator:
+    """
+    Checks and normalizes portfolios against one template's field spec.
+
+    Args:
+        required_fields (dict): Field name -> spec, as in template_data_requirements.json.
+        optional_fields (dict): Field name -> spec.
+    """
+
+    def __init__(self, required_fields: dict, optional_fields: dict):
+        self.required = list(required_fields)
+        self.fields = {name: _compile(spec) for name, spec in {**optional_fields, **required_fields}.items()}
+
+    def __call__(self, data, partial: bool = False) -> dict:
+        """
+        Check a portfolio and return it in canonical shape.
+
+        Args:
+            data (dict): Portfolio input; it is not modified.
+            partial (bool): Allow required fields to be missing, e.g. in previews of a form being filled in.
+
+        Returns:
+            dict: The normalized portfolio.
+
+        Raises:
+            ValidationError: Listing every field that is missing or has the wrong type.
+        """
+        if not isinstance(data, dict):
+            raise ValidationError(["Portfolio data must be an object"])
+        # A canonical name given alongside its alias wins
+        data = {**{ALIASES[key]: value for key, value in data.items() if key in ALIASES},
+                **{key: value for key, value in data.items() if key not in ALIASES}}
+
+        errors = []
+        invalid = set()
+        result = {}
+        for key, value in data.items():
+            check = self.fields.get(key)
+            if check is None:
+                result[key] = value
+            elif value is not None:
+                found = len(errors)
+                checked = check(value, key, errors)
+                if checked is not _MISSING:
+                    result[key] = checked
+                elif len(errors) > found:
+                    invalid.add(key)
+        if not partial:
+            errors.extend(f"{name} is required" for name in self.required if name not in result and name not in invalid)
+        if errors:
+            raise ValidationError(errors)
+        return result
@@ -0,0 +1,96 @@
+import os
+import json
+import hashlib
+from . import metrics
+from .cache import SQLiteCache
+from .enhancer import enhance_fields
+from .logs import get_logger
+from .provider import MODEL_NAME
+
+logger = get_logger(__name__)
+
+# Reuse a portfolio's earlier enhancements for fields whose source did not change
+ENABLED = os.getenv("SNAPSHOTS_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# Last enhanced fields of each portfolio, shared across workers: portfolio key ->
+# {field id: [source hash, enhanced text]}
+snapshot_store = SQLiteCache(
+    "snapshots",
+    ttl=float(os.getenv("SNAPSHOT_TTL", str(30 * 24 * 3600))),
+    max_entries=int(os.getenv("SNAPSHOT_MAX_ENTRIES", "10000")),
+)
+
+# Submitted fields that identify the same portfolio across edits
+IDENTITY_FIELDS = ("name", "email", "githubUrl", "linkedinUrl")
+
+
+def portfolio_key(data: dict, *salt: str) -> str | None:
+    """
+    Stable key of the portfolio a submission belongs to, or None if nothing identifies it.
+
+    Args:
+        data (dict): Portfolio input.
+        *salt (str): Separates snapshots of callers with different fields, e.g. the generator's template.
+    """
+    identity = [" ".join(str(data.get(field) or "").split()).lower() for field in IDENTITY_FIELDS]
+    if not any(identity):
+        return None
+    return hashlib.sha256("\0".join([*salt, *identity]).encode("utf-8")).hexdigest()
+
+
+def source_hash(prompt_instruction: str, content: str) -> str:
+    """Hash of a field's normalized source; whitespace-only edits keep the same hash."""
+    normalized = " ".join(str(content).split())
+    return hashlib.sha256(f"{MODEL_NAME}\0{prompt_instruction}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def _load(key: str) -> dict:
+    record = snapshot_store.get(key)
+    try:
+        return json.loads(record) if record else {}
+    except ValueError:
+        return {}
+
+
+def enhance_changed(key: str | None, fields: dict[str, tuple[str, str]]) -> dict[str, str]:
+    """
+    Enhance only the fields whose source changed since this portfolio was last enhanced.
+
+    A field is reused when the previous snapshot has an enhancement of the same
+    normalized source, under any field id, so reordered projects are reused too.
+    Fields that could not be enhanced are left out of the new snapshot and are
+    retried on the next submission.
+
+    Args:
+        key (str | None): portfolio_key() of the submission; None enhances every field.
+        fields (dict[str, tuple[str, str]]): Field id -> (prompt_instruction, content).
+
+    Returns:
+        dict[str, str]: Field id -> enhanced content, for every id in fields.
+    """
+    if key is None or not ENABLED:
+        return enhance_fields(fields)
+
+    previous = {source: enhanced for source, enhanced in _load(key).values()}
+    sources = {field_id: source_hash(instruction, content) for field_id, (instruction, content) in fields.items()}
+    results = {}
+    changed = {}
+    for field_id, pair in fields.items():
+        if sources[field_id] in previous:
+            results[field_id] = previous[sources[field_id]]
+        else:
+            changed[field_id] = pair
+    metrics.cache_requests.inc(len(results), cache="snapshots", result="hit")
+    metrics.cache_requests.inc(len(changed), cache="snapshots", result="miss")
+
+    if changed:
+        logger.info("Enhancing changed fields", changed=list(changed), reused=len(results))
+        results.update(enhance_fields(changed))
+
+    snapshot = {
+        field_id: [sources[field_id], results[field_id]]
+        for field_id, (_, content) in fields.items()
+        if field_id not in changed or results[field_id] != content
+    }
+    snapshot_store.set(key, json.dumps(snapshot, ensure_ascii=False))
+    return {field_id: results[field_id] for field_id in fields}
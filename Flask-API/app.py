@@ -1,22 +1,181 @@
-from flask import Flask, request, jsonify, render_template, session, send_file
+from flask import Blueprint, Flask, Response, g, request, jsonify, render_template, session, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 import os
+import re
 import json
-from jinja2 import Environment, FileSystemLoader
+import time
+import uuid
+from Portfolio import artifacts, assets, compression, deadline, logs, metrics, renderer
+from Portfolio.enhancer import enhancement_cache
+from Portfolio.provider import provider
+from Portfolio.registry import templates as template_registry
+from Portfolio.schema import ValidationError
+import github_client
+import jobs
+import pipeline
+from preview_cache import preview_key, previews
 
-app = Flask(__name__)
-app.secret_key = 'portfolio_generator_secret_key'
-CORS(app, supports_credentials=True)
+logger = logs.get_logger(__name__)
+
+# Build the Gemini client, compile templates and open pools when the app is
+# created; with WARM_UP=0 each is loaded on first use instead
+WARM_UP = os.getenv("WARM_UP", "true").lower() not in ("0", "false", "no")
+
+# Seconds create_app() may take, warm-up included, before a warning is logged
+COLD_START_BUDGET = float(os.getenv("COLD_START_BUDGET", "3"))
+
+# Seconds a request may spend on GitHub and Gemini before pending fields fall
+# back to their submitted text; 0 disables the limit
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "25"))
+
+# Per-endpoint overrides of REQUEST_DEADLINE, e.g. DEADLINE_GENERATE=40 or DEADLINE_PREVIEW=5
+ENDPOINT_DEADLINES = {
+    endpoint: float(os.getenv(f"DEADLINE_{name}", REQUEST_DEADLINE))
+    for endpoint, name in {
+        'api.index': 'GENERATE',
+        'api.get_template': 'GENERATE',
+        'api.generate_portfolio': 'GENERATE',
+        'api.generate_portfolio_with_template': 'GENERATE_PORTFOLIO',
+        'api.preview_portfolio': 'PREVIEW',
+    }.items()
+}
+
+api = Blueprint('api', __name__)
+
+# Incoming X-Request-ID values that are safe to reuse as correlation ids
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,128}$')
+
+@api.before_app_request
+def assign_request_id():
+    """Tag everything logged for this request with the caller's X-Request-ID or a new id"""
+    incoming = request.headers.get('X-Request-ID', '')
+    g.request_id = incoming if REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+    logs.request_id.set(g.request_id)
+
+@api.before_app_request
+def start_timing():
+    """Collect per-stage timings for this request's Server-Timing header"""
+    g.request_start = time.perf_counter()
+    g.timings = {}
+
+@api.before_app_request
+def start_deadline():
+    """Give this request its endpoint's time budget for outbound calls"""
+    seconds = ENDPOINT_DEADLINES.get(request.endpoint, REQUEST_DEADLINE)
+    deadline.start(seconds if seconds > 0 else None)
+
+@api.after_app_request
+def record_timing(response):
+    """Report stage timings in Server-Timing and record the request in the latency histogram"""
+    start = g.get('request_start')
+    if start is None:
+        return response
+    # For streamed responses this is the time to the first byte
+    total = time.perf_counter() - start
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.http_request_seconds.observe(total, method=request.method, endpoint=endpoint, status=response.status_code)
+    timings = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in g.get('timings', {}).items()]
+    response.headers['Server-Timing'] = ', '.join(timings + [f"total;dur={total * 1000:.1f}"])
+    if g.get('request_id'):
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+def describe_template(template):
+    """Public view of a template registry entry"""
+    return {key: template[key] for key in ('name', 'file', 'description', 'required_fields', 'optional_fields')}
 
 def get_available_templates():
     """Get list of available templates"""
-    return [
-        {'name': 'Modern', 'file': 'template_modern.html', 'description': 'Modern glassmorphism design with video background'},
-        {'name': 'Creative', 'file': 'template_creative.html', 'description': 'Creative design with animations and unique layouts'},
-        {'name': 'Minimal', 'file': 'tamplate_minimal.html', 'description': 'Clean minimal design focused on content'}
-    ]
+    return [describe_template(t) for t in template_registry.all() if t['available']]
+
+def lookup_template(template_name):
+    """Registry entry of a template, or an error response if it is unknown or its file is missing"""
+    template = template_registry.get(template_name)
+    if not template:
+        available = ', '.join(template_registry.names())
+        return None, (jsonify({'error': f'Template {template_name} not supported. Available: {available}'}), 400)
+    if not template['available']:
+        return None, (jsonify({'error': f"Template file {template['file']} not found"}), 404)
+    return template, None
+
+def validate_portfolio(template, portfolio_data, partial=False):
+    """Portfolio data in the template's canonical shape, or an error response listing what is wrong with it"""
+    try:
+        return template['validate'](portfolio_data, partial), None
+    except ValidationError as e:
+        metrics.validation_failures.inc(template=template['name'])
+        return None, (jsonify({'error': str(e), 'errors': e.errors}), 400)
+
+def wants_async(data):
+    """Whether the client opted into background generation (?async=1 or "async": true)"""
+    flag = request.args.get('async', data.get('async', False) if isinstance(data, dict) else False)
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def wants_html(data):
+    """Whether the client asked for raw HTML (?format=html, "format": "html" or Accept: text/html)"""
+    requested = request.args.get('format', data.get('format') if isinstance(data, dict) else None)
+    if requested:
+        return requested == 'html'
+    return request.accept_mimetypes.best_match(['application/json', 'text/html']) == 'text/html'
+
+def with_preview_headers(response, etag):
+    """Mark a preview response so clients revalidate it with its ETag"""
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    return response
+
+def preview_response(etag_base, body, mimetype):
+    """Send a rendered preview, compressed once per encoding and then served from the preview cache"""
+    encoding = compression.negotiate(request.accept_encodings)
+    if encoding is None:
+        return with_preview_headers(Response(body, mimetype=mimetype), f'"{etag_base}"')
+    response = Response(previews.encoded(etag_base, encoding, body), mimetype=mimetype)
+    response.headers['Content-Encoding'] = encoding
+    return with_preview_headers(response, f'"{etag_base}-{encoding}"')
+
+def run_generation(portfolio_data, template_name, template_file, run_async):
+    """Run the generation pipeline inline, or queue it and return a job reference"""
+    artifact = pipeline.artifact_key(portfolio_data, template_file)
 
-@app.route('/', methods=['GET', 'POST'])
+    if run_async:
+        try:
+            job = jobs.submit(generation_job, portfolio_data, template_name, template_file, artifact)
+        except jobs.QueueFullError as e:
+            return jsonify({'error': str(e)}), 503
+        # The artifact id is only known once the job finishes: a partially enhanced
+        # result is stored under its own id, so clients read it from the job's result
+        session.pop('last_artifact_id', None)
+        session['last_job_id'] = job['id']
+        return jsonify({
+            'success': True,
+            'message': 'Portfolio generation queued; artifact_id and download_url are in the job result',
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': f"/jobs/{job['id']}",
+            'template_used': template_name
+        }), 202
+
+    result = generation_job(portfolio_data, template_name, template_file, artifact, g.timings)
+    # A partially enhanced result is stored under its own id
+    session.pop('last_job_id', None)
+    session['last_artifact_id'] = result['artifact_id']
+    return jsonify({
+        'success': True,
+        'message': 'Portfolio generated successfully',
+        **result
+    })
+
+def generation_job(portfolio_data, template_name, template_file, artifact=None, timings=None):
+    """Generate a portfolio and describe where the result was stored"""
+    result = pipeline.generate(portfolio_data, template_file, timings, artifact)
+    return {
+        **result,
+        'download_url': f"/download-html/{result['artifact_id']}",
+        'template_used': template_name
+    }
+
+@api.route('/', methods=['GET', 'POST'])
 def index():
     """Home page with template selection or generate portfolio"""
     if request.method == 'POST':
@@ -33,17 +192,21 @@ def index():
             'GET /api/templates': 'Template API - Get available templates',
             'GET /api/template/<name>': 'Template API - Get specific template',
             'POST /': 'Generate portfolio with template and data',
-            'POST /generate': 'Generate portfolio with template and data'
+            'POST /preview': 'Render a preview as JSON, or stream raw HTML with ?format=html',
+            'POST /generate': 'Generate portfolio with template and data (add ?async=1 to queue it; the job result has its download_url)',
+            'GET /jobs/<id>': 'Status, stage timings and result of a queued generation',
+            'GET /download-html/<id>': 'Download a generated portfolio (add ?inline=1 for a self-contained file)',
+            'GET /metrics': 'Prometheus metrics for pipeline stages, Gemini, GitHub and caches'
         }
     })
 
-@app.route('/templates', methods=['GET'])
+@api.route('/templates', methods=['GET'])
 def get_templates():
     """Get available templates"""
     templates = get_available_templates()
     return jsonify({'templates': templates})
 
-@app.route('/template', methods=['GET', 'POST'])
+@api.route('/template', methods=['GET', 'POST'])
 def get_template():
     """Get available templates or handle template selection"""
     if request.method == 'POST':
@@ -73,7 +236,7 @@ def get_template():
     templates = get_available_templates()
     return jsonify({'templates': templates})
 
-@app.route('/api/templates', methods=['GET'])
+@api.route('/api/templates', methods=['GET'])
 def api_get_templates():
     """Template API - Get available templates"""
     templates = get_available_templates()
@@ -82,13 +245,12 @@ def api_get_templates():
         'templates': templates
     })
 
-@app.route('/api/template/<template_name>', methods=['GET'])
+@api.route('/api/template/<template_name>', methods=['GET'])
 def api_get_template_details(template_name):
     """Template API - Get specific template details"""
-    templates = get_available_templates()
-    template = next((t for t in templates if t['name'] == template_name), None)
+    template = template_registry.get(template_name)
     
-    if not template:
+    if not template or not template['available']:
         return jsonify({
             'success': False,
             'error': f'Template {template_name} not found'
@@ -96,15 +258,15 @@ def api_get_template_details(template_name):
     
     return jsonify({
         'success': True,
-        'template': template
+        'template': describe_template(template)
     })
 
-@app.route('/generate', methods=['POST'])
+@api.route('/generate', methods=['POST'])
 def generate_portfolio():
     """Generate portfolio with selected template and data"""
     try:
         data = request.get_json()
-        print(f"Received data: {data}")  # Debug logging
+        logger.debug_payload("Received generation request", data)
         
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
@@ -112,94 +274,29 @@ def generate_portfolio():
         template_name = data.get('templateName', 'Modern')  # Default to Modern
         portfolio_data = data.copy()  # Use entire data
         
-        print(f"Template: {template_name}, Portfolio data keys: {list(portfolio_data.keys()) if isinstance(portfolio_data, dict) else 'Not a dict'}")
-        
-        # Remove templateName from portfolio data to avoid conflicts
-        if 'templateName' in portfolio_data:
-            del portfolio_data['templateName']
-        
-        if not portfolio_data or not portfolio_data.get('name'):
-            return jsonify({'error': 'Portfolio data with name is required'}), 400
-        
-        # Fetch GitHub projects if GitHub URL is provided
-        if portfolio_data.get('githubUrl') and not portfolio_data.get('projects'):
-            try:
-                import requests
-                github_username = portfolio_data['githubUrl'].split('github.com/')[1].split('/')[0]
-                response = requests.get(f'https://api.github.com/users/{github_username}/repos?sort=updated&per_page=6')
-                
-                if response.status_code == 200:
-                    repos = response.json()
-                    portfolio_data['projects'] = [{
-                        'name': repo['name'],
-                        'description': repo['description'] or f"A {repo['language']} project",
-                        'url': repo['html_url'],
-                        'language': repo['language']
-                    } for repo in repos if not repo['fork']]
-                    print(f"Fetched {len(portfolio_data['projects'])} GitHub projects")
-            except Exception as e:
-                print(f"Error fetching GitHub projects: {e}")
-        
-        # Enhance content with AI
-        try:
-            from Portfolio.enhancer import enhance_content
-            if portfolio_data.get('about'):
-                portfolio_data['about'] = enhance_content(
-                    "Rewrite this about section to be more professional and engaging for a portfolio:",
-                    portfolio_data['about']
-                )
-            if portfolio_data.get('projects'):
-                for project in portfolio_data['projects']:
-                    if project.get('description'):
-                        project['description'] = enhance_content(
-                            "Improve this project description to be more compelling and professional:",
-                            project['description']
-                        )
-            print("Content enhanced with AI")
-        except Exception as e:
-            print(f"Error enhancing content: {e}")
-        
-        # Map template names to files
-        template_map = {
-            'Modern': 'template_modern.html',
-            'Creative': 'template_creative.html', 
-            'Minimal': 'tamplate_minimal.html'
-        }
-        
-        template_file = template_map.get(template_name)
-        if not template_file:
-            return jsonify({'error': f'Template {template_name} not supported. Available: Modern, Creative, Minimal'}), 400
-        
-        # Check if template file exists
-        template_path = os.path.join('Portfolio/templates', template_file)
-        if not os.path.exists(template_path):
-            return jsonify({'error': f'Template file {template_file} not found'}), 404
+        logger.info("Generation requested", template=template_name, keys=list(portfolio_data.keys()) if isinstance(portfolio_data, dict) else None)
         
-        # Generate portfolio
-        env = Environment(loader=FileSystemLoader('Portfolio/templates'))
-        template = env.get_template(template_file)
-        html_content = template.render(**portfolio_data)
+        # Remove request options from portfolio data to avoid conflicts
+        portfolio_data.pop('templateName', None)
+        portfolio_data.pop('async', None)
         
-        # Save to output directory
-        os.makedirs('output', exist_ok=True)
-        output_path = os.path.join('output', 'portfolio.html')
+        template, error = lookup_template(template_name)
+        if error:
+            return error
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Reject malformed input before spending GitHub calls or Gemini tokens on it
+        portfolio_data, error = validate_portfolio(template, portfolio_data)
+        if error:
+            return error
         
-        return jsonify({
-            'success': True,
-            'message': 'Portfolio generated successfully',
-            'output_path': output_path,
-            'template_used': template_name
-        })
+        return run_generation(portfolio_data, template_name, template['file'], wants_async(data))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/preview', methods=['POST'])
+@api.route('/preview', methods=['POST'])
 def preview_portfolio():
-    """Preview portfolio without saving"""
+    """Preview portfolio without saving, as JSON or as streamed text/html"""
     try:
         data = request.get_json()
         
@@ -209,31 +306,51 @@ def preview_portfolio():
         if not template_name or not portfolio_data:
             return jsonify({'error': 'Template name and data are required'}), 400
         
-        # Map template names to files
-        template_map = {
-            'Modern': 'template_modern.html',
-            'Creative': 'template_creative.html',
-            'Minimal': 'tamplate_minimal.html'
-        }
-        
-        template_file = template_map.get(template_name)
-        if not template_file:
-            return jsonify({'error': f'Template {template_name} not supported'}), 400
-        
-        # Generate HTML
-        env = Environment(loader=FileSystemLoader('Portfolio/templates'))
-        template = env.get_template(template_file)
-        html_content = template.render(**portfolio_data)
-        
-        return jsonify({
+        template, error = lookup_template(template_name)
+        if error:
+            return error
+        template_file = template['file']
+        
+        # Previews may show a form still being filled in, so required fields can be missing
+        portfolio_data, error = validate_portfolio(template, portfolio_data, partial=True)
+        if error:
+            return error
+        
+        as_html = wants_html(data)
+        key = preview_key(template_name, portfolio_data, renderer.template_version(template_file))
+        etag_base = f'{key}-{"html" if as_html else "json"}'
+        
+        # Unchanged input: the client's copy, in whichever encoding, is still valid; skip rendering entirely
+        current = {f'"{etag_base}"', *(f'"{etag_base}-{encoding}"' for encoding in compression.ENCODINGS)}
+        matched = current.intersection(tag.strip() for tag in request.headers.get('If-None-Match', '').split(','))
+        if matched:
+            return with_preview_headers(Response(status=304), matched.pop())
+        
+        with pipeline.stage(g.timings, 'preview_cache'):
+            html_content = previews.get(key)
+        if as_html:
+            if html_content is None:
+                # Raw HTML mode streams chunks as they render instead of building the page in memory;
+                # repeat requests are served compressed from the cache
+                chunks = previews.capture(key, renderer.stream_template(template_file, portfolio_data))
+                return with_preview_headers(Response(stream_with_context(chunks), mimetype='text/html'), f'"{etag_base}"')
+            return preview_response(etag_base, html_content.encode('utf-8'), 'text/html')
+        
+        if html_content is None:
+            # Generate HTML
+            with pipeline.stage(g.timings, 'render'):
+                html_content = renderer.render_template(template_file, portfolio_data)
+            previews.set(key, html_content)
+        
+        return preview_response(etag_base, jsonify({
             'success': True,
             'html_content': html_content
-        })
+        }).get_data(), 'application/json')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/portfolio-templates', methods=['GET', 'POST'])
+@api.route('/portfolio-templates', methods=['GET', 'POST'])
 def portfolio_templates():
     """Handle template selection from frontend"""
     if request.method == 'POST':
@@ -260,110 +377,161 @@ def portfolio_templates():
         'selected_template': session.get('selected_template')
     })
 
-@app.route('/generate-portfolio', methods=['POST'])
+@api.route('/generate-portfolio', methods=['POST'])
 def generate_portfolio_with_template():
     """Generate portfolio using template from session"""
     try:
         data = request.get_json()
-        print(f"Received portfolio data: {data}")
+        logger.debug_payload("Received portfolio data", data)
         
         if not data:
             return jsonify({'error': 'No portfolio data provided'}), 400
         
         template_name = session.get('selected_template', 'Modern')
-        print(f"Using template from session: {template_name}")
-        
-        # Fetch GitHub projects if GitHub URL is provided
-        if data.get('githubUrl') and not data.get('projects'):
-            try:
-                import requests
-                github_username = data['githubUrl'].split('github.com/')[1].split('/')[0]
-                response = requests.get(f'https://api.github.com/users/{github_username}/repos?sort=updated&per_page=6')
-                
-                if response.status_code == 200:
-                    repos = response.json()
-                    data['projects'] = [{
-                        'name': repo['name'],
-                        'description': repo['description'] or f"A {repo['language']} project",
-                        'url': repo['html_url'],
-                        'language': repo['language']
-                    } for repo in repos if not repo['fork']]
-                    print(f"Fetched {len(data['projects'])} GitHub projects")
-            except Exception as e:
-                print(f"Error fetching GitHub projects: {e}")
-        
-        # Enhance content with AI
-        try:
-            from Portfolio.enhancer import enhance_content
-            if data.get('about'):
-                data['about'] = enhance_content(
-                    "Rewrite this about section to be more professional and engaging for a portfolio:",
-                    data['about']
-                )
-            if data.get('projects'):
-                for project in data['projects']:
-                    if project.get('description'):
-                        project['description'] = enhance_content(
-                            "Improve this project description to be more compelling and professional:",
-                            project['description']
-                        )
-            print("Content enhanced with AI")
-        except Exception as e:
-            print(f"Error enhancing content: {e}")
-        
-        template_map = {
-            'Modern': 'template_modern.html',
-            'Creative': 'template_creative.html',
-            'Minimal': 'tamplate_minimal.html'
-        }
-        
-        template_file = template_map.get(template_name)
-        if not template_file:
-            return jsonify({'error': f'Template {template_name} not supported'}), 400
-        
-        template_path = os.path.join('Portfolio/templates', template_file)
-        if not os.path.exists(template_path):
-            return jsonify({'error': f'Template file {template_file} not found'}), 404
-        
-        env = Environment(loader=FileSystemLoader('Portfolio/templates'))
-        template = env.get_template(template_file)
-        html_content = template.render(**data)
+        logger.info("Using template from session", template=template_name)
         
-        os.makedirs('output', exist_ok=True)
-        output_path = os.path.join('output', 'portfolio.html')
+        template, error = lookup_template(template_name)
+        if error:
+            return error
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Portfolio generated successfully',
-            'output_path': output_path,
-            'template_used': template_name
-        })
+        run_async = wants_async(data)
+        data.pop('async', None)
+        portfolio_data, error = validate_portfolio(template, data)
+        if error:
+            return error
+        return run_generation(portfolio_data, template_name, template['file'], run_async)
         
     except Exception as e:
-        print(f"Error generating portfolio: {str(e)}")
+        logger.exception("Error generating portfolio", error=str(e))
         return jsonify({'error': str(e)}), 500
 
-@app.route('/download-html', methods=['GET'])
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Report status, per-stage timings and result location of a generation job"""
+    job = jobs.get_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': f'Job {job_id} not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/download-html', methods=['GET'])
 def download_html():
-    """Download the generated portfolio HTML file"""
+    """Download the portfolio most recently generated in this session"""
+    artifact = session.get('last_artifact_id')
+    job_id = session.get('last_job_id')
+    if not artifact and job_id:
+        # Queued generation: take the id the job actually stored its result under
+        job = jobs.get_job(job_id)
+        if job and job['status'] in ('queued', 'running'):
+            return jsonify({'error': 'Portfolio is still being generated', 'status_url': f'/jobs/{job_id}'}), 409
+        artifact = (job or {}).get('result', {}).get('artifact_id')
+        if artifact:
+            session['last_artifact_id'] = artifact
+    if not artifact:
+        return jsonify({'error': 'Portfolio not found. Please generate a portfolio first.'}), 404
+    return download_artifact(artifact)
+
+@api.route('/download-html/<artifact_id>', methods=['GET'])
+def download_artifact(artifact_id):
+    """Download a generated portfolio HTML file by artifact id, optionally with its assets inlined"""
     try:
-        output_path = os.path.join('output', 'portfolio.html')
+        output_path = artifacts.find(artifact_id)
         
-        if not os.path.exists(output_path):
+        if not output_path:
             return jsonify({'error': 'Portfolio not found. Please generate a portfolio first.'}), 404
         
-        return send_file(
-            output_path,
+        if request.args.get('inline', '').lower() in ('1', 'true', 'yes'):
+            with open(output_path, encoding='utf-8') as f:
+                html_content = assets.inline(f.read())
+            response = Response(html_content, mimetype='text/html')
+            response.headers['Content-Disposition'] = 'attachment; filename=portfolio.html'
+            return response
+        
+        # Serve the stored gzip/brotli copy the client accepts, if there is one
+        encoding = compression.negotiate(request.accept_encodings)
+        variant = artifacts.encoded(output_path, encoding) if encoding else None
+        response = send_file(
+            os.path.abspath(variant or output_path),
             as_attachment=True,
             download_name='portfolio.html',
             mimetype='text/html'
         )
+        if variant:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api.route('/assets/<path:filename>', methods=['GET'])
+def get_asset(filename):
+    """Serve a built asset; its name changes with its content, so browsers may keep it for good"""
+    response = send_from_directory(os.path.abspath(assets.ASSET_DIR), filename, max_age=assets.MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={assets.MAX_AGE}, immutable'
+    return response
+
+def warm_up() -> dict[str, float]:
+    """
+    Load everything a first request would otherwise wait for.
+
+    Safe to run before a pre-fork server forks: the Gemini client, HTTP
+    session, SQLite connections and job pool are all rebuilt in each child,
+    while compiled templates are inherited.
+
+    Returns:
+        dict[str, float]: Seconds spent in each step.
+    """
+    steps = {
+        'assets': assets.get_manifest,
+        'templates': renderer.precompile_templates,
+        'gemini': provider.get_model,
+        'github': github_client.get_session,
+        'caches': lambda: [cache.open() for cache in (enhancement_cache, github_client.response_cache, jobs.job_store)],
+    }
+    timings = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Warm-up step failed", step=name, error=str(e))
+        timings[name] = round(time.perf_counter() - start, 4)
+        metrics.cold_start_seconds.set(timings[name], step=name)
+    return timings
+
+def create_app(warm: bool | None = None) -> Flask:
+    """
+    Create the Flask application.
+
+    Args:
+        warm (bool | None): Run warm_up() before returning. Defaults to WARM_UP.
+
+    Returns:
+        Flask: The configured application.
+    """
+    start = time.perf_counter()
+    logs.configure()
+
+    app = Flask(__name__)
+    app.secret_key = 'portfolio_generator_secret_key'
+    CORS(app, supports_credentials=True)
+    app.register_blueprint(api)
+
+    timings = warm_up() if (WARM_UP if warm is None else warm) else {}
+    total = round(time.perf_counter() - start, 4)
+    metrics.cold_start_seconds.set(total, step='total')
+    if total > COLD_START_BUDGET:
+        logger.warning("Cold start over budget", seconds=total, budget=COLD_START_BUDGET, steps=timings)
+    else:
+        logger.info("App ready", seconds=total, steps=timings)
+    return app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True, port=8000)
\ No newline at end of file
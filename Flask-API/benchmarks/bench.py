@@ -0,0 +1,227 @@
+"""
+Micro-benchmarks for the render, enhancement and GitHub fetch stages, and
+for worker cold start.
+
+Runs entirely offline: Gemini is replaced by a stub model and GitHub by a
+local HTTP stub server, and the enhancement, GitHub and artifact caches are
+disabled so every iteration does the real work.
+
+Usage (from Flask-API/):
+    python benchmarks/bench.py
+    python benchmarks/bench.py --iterations 50 --output output/bench.json
+    python benchmarks/bench.py --baseline output/bench-main.json --threshold 0.15
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import threading
+import statistics
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Portfolio import artifacts, enhancer, renderer, snapshots  # noqa: E402
+from Portfolio.provider import provider  # noqa: E402
+from Portfolio.generator import TEMPLATE_FILE, generate_portfolio  # noqa: E402
+from Portfolio.registry import templates  # noqa: E402
+import github_client  # noqa: E402
+import github_fetcher  # noqa: E402
+from portfolios import SIZES, synthetic_portfolio  # noqa: E402
+
+TEMPLATES = {
+    **{t["name"]: t["file"] for t in templates.all() if t["available"]},
+    "template_portfolio": TEMPLATE_FILE,
+}
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Answers like Gemini, instantly, for both per-field and structured requests."""
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        if generation_config and generation_config.get("response_schema"):
+            fields = generation_config["response_schema"]["properties"]
+            return StubResponse(json.dumps({field_id: f"Enhanced {field_id}" for field_id in fields}))
+        return StubResponse("Enhanced content")
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    """Serves /users/<name>/repos, /commits and /branches with fixed payloads."""
+
+    protocol_version = "HTTP/1.1"
+    # Send each response as one segment so delayed ACKs do not dominate the timings
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+    repos = json.dumps([
+        {
+            "name": f"repo-{i}", "description": None if i % 3 == 0 else f"Repository {i}", "html_url": f"https://github.com/u/repo-{i}",
+            "language": "Python", "fork": i % 7 == 6, "size": 100, "stargazers_count": i, "forks_count": i % 4,
+        }
+        for i in range(30)
+    ]).encode()
+    page = json.dumps([{"sha": "0" * 40}]).encode()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = self.repos if "/users/" in self.path else self.page
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if "/users/" not in self.path:
+            self.send_header("Link", '<http://stub/?per_page=1&page=42>; rel="last"')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def measure(func, iterations: int, warmup: int = 2) -> dict:
+    """Latency statistics over `iterations` calls plus tracemalloc figures for one call."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+        "min_ms": round(samples[0] * 1000, 4),
+        "max_ms": round(samples[-1] * 1000, 4),
+        "peak_alloc_bytes": peak,
+        "retained_bytes": current,
+        "live_blocks": blocks,
+    }
+
+
+def bench_render(iterations: int) -> dict:
+    results = {}
+    for label, template_file in TEMPLATES.items():
+        template = renderer.get_template(template_file)
+        for size in SIZES:
+            data = synthetic_portfolio(size)
+            results[f"render/{label}/{size}"] = measure(lambda: template.render(**data), iterations)
+    return results
+
+
+def bench_generate(iterations: int) -> dict:
+    results = {}
+    for mode in ("portfolio", "fields"):
+        enhancer.ENHANCE_MODE = mode
+        for size in SIZES:
+            data = synthetic_portfolio(size)
+            results[f"generate_portfolio/{mode}/{size}"] = measure(lambda: generate_portfolio(data), iterations)
+    return results
+
+
+def bench_fetch(iterations: int) -> dict:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    github_client.GITHUB_API_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        return {
+            "fetch_github_repos": measure(lambda: github_fetcher.fetch_github_repos("stub"), iterations),
+            "fetch_repo_summaries": measure(lambda: github_fetcher.fetch_repo_summaries("stub"), iterations),
+        }
+    finally:
+        server.shutdown()
+
+
+def bench_startup(iterations: int) -> dict:
+    """Wall time for a fresh interpreter to import the app, with and without warm-up."""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, LOG_LEVEL="WARNING", GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", "bench-key"))
+
+    def start(warm: str):
+        subprocess.run([sys.executable, "-c", "import app"], cwd=app_dir, env=dict(env, WARM_UP=warm),
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return {
+        "startup/import": measure(lambda: start("0"), iterations, warmup=1),
+        "startup/import+warm_up": measure(lambda: start("1"), iterations, warmup=1),
+    }
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> list[str]:
+    """Benchmarks whose p50 latency grew by more than `threshold` against a previous run."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["benchmarks"]
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous and previous["p50_ms"] > 0:
+            change = result["p50_ms"] / previous["p50_ms"] - 1
+            if change > threshold:
+                regressions.append(f"{name}: p50 {previous['p50_ms']}ms -> {result['p50_ms']}ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the portfolio pipeline.")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per benchmark")
+    parser.add_argument("--only", choices=["render", "generate", "fetch", "startup"], action="append", help="Run only these groups")
+    parser.add_argument("--output", default=os.path.join("output", "benchmarks.json"), help="Where to write JSON results")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed p50 slowdown before a regression is reported")
+    args = parser.parse_args(argv)
+
+    # Offline and uncached, so each iteration exercises the real code path
+    provider.set_model(StubModel())
+    enhancer.CACHE_ENABLED = False
+    snapshots.ENABLED = False
+    enhancer.gemini_limits.limits = {}  # the stub has no quota to protect
+    github_client.CACHE_ENABLED = False
+    artifacts.ARTIFACT_DIR = tempfile.mkdtemp(prefix="bench-artifacts-")
+    artifacts.find = lambda artifact: None  # never short-circuit on an earlier iteration
+
+    groups = {"render": bench_render, "generate": bench_generate, "fetch": bench_fetch, "startup": bench_startup}
+    results = {}
+    for name in args.only or groups:
+        print(f"Running {name} benchmarks...")
+        results.update(groups[name](args.iterations))
+
+    for name, result in results.items():
+        print(f"{name:45s} p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms  peak {result['peak_alloc_bytes'] / 1024:9.1f} KiB")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "benchmarks": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+Local stand-ins for the Gemini and GitHub APIs with injectable latency,
+errors and rate limiting, for load tests that must not touch the real services.
+
+Latency specs are "fixed:SECONDS", "uniform:LOW:HIGH" or "lognormal:MEDIAN:SIGMA".
+
+Usage (from Flask-API/), then start the app with the printed environment:
+    python benchmarks/fakes.py --gemini-latency lognormal:0.8:0.5 --gemini-error-rate 0.02
+    python benchmarks/fakes.py --github-latency uniform:0.05:0.3 --github-rate-limit 5000
+"""
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class Latency:
+    """A latency distribution parsed from a spec string; sample() returns seconds."""
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, *params = spec.split(":")
+        values = [float(p) for p in params]
+        if kind == "fixed" and len(values) == 1:
+            self._sample = lambda: values[0]
+        elif kind == "uniform" and len(values) == 2:
+            self._sample = lambda: random.uniform(values[0], values[1])
+        elif kind == "lognormal" and len(values) == 2 and values[0] > 0:
+            self._sample = lambda: random.lognormvariate(math.log(values[0]), values[1])
+        else:
+            raise ValueError(f"Invalid latency spec {spec!r}; use fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+        self.spec = spec
+
+    def sample(self) -> float:
+        return max(0.0, self._sample())
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Shared plumbing: JSON responses in one segment, injected latency and counters."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status: int, payload, headers: dict | None = None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def injected_failure(self) -> str | None:
+        """Sleep for the configured latency, then roll for an error or rate-limit response."""
+        server = self.server
+        time.sleep(server.latency.sample())
+        server.count("requests")
+        roll = random.random()
+        if roll < server.rate_limit_rate:
+            server.count("rate_limited")
+            return "rate_limited"
+        if roll < server.rate_limit_rate + server.error_rate:
+            server.count("errors")
+            return "error"
+        return None
+
+
+class FakeGeminiHandler(FakeHandler):
+    """
+    Answers POST /v1beta/models/<model>:generateContent like the Gemini REST API.
+
+    Structured requests (generationConfig.responseSchema) get a JSON object
+    with every requested property; plain requests get one line of text.
+    """
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        failure = self.injected_failure()
+        if failure == "rate_limited":
+            return self.send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).", "status": "RESOURCE_EXHAUSTED"}})
+        if failure == "error":
+            return self.send_json(500, {"error": {"code": 500, "message": "An internal error has occurred.", "status": "INTERNAL"}})
+        if ":generateContent" not in self.path:
+            return self.send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+        schema = (request.get("generationConfig") or {}).get("responseSchema")
+        if schema:
+            text = json.dumps({field_id: f"Enhanced {field_id} content." for field_id in schema.get("properties", {})})
+        else:
+            text = "Enhanced content with a more professional and engaging tone."
+        self.send_json(200, {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": len(json.dumps(request)) // 4, "candidatesTokenCount": len(text) // 4},
+        })
+
+
+class FakeGitHubHandler(FakeHandler):
+    """
+    Serves /users/<name>/repos, /repos/<owner>/<repo>/commits and /branches.
+
+    Every response carries X-RateLimit-* headers from a fixed window budget;
+    once it is spent requests get 403 until the window resets, as on GitHub.
+    Conditional requests with a matching ETag get 304 and cost nothing.
+    """
+
+    def do_GET(self):
+        failure = self.injected_failure()
+        path = self.path.split("?")[0].strip("/").split("/")
+        if len(path) == 3 and path[0] == "users" and path[2] == "repos":
+            payload = [
+                {
+                    "name": f"{path[1]}-repo-{i}",
+                    "description": None if i % 3 == 0 else f"Repository {i} of {path[1]}",
+                    "html_url": f"https://github.com/{path[1]}/{path[1]}-repo-{i}",
+                    "language": ["Python", "JavaScript", "Go"][i % 3],
+                    "fork": i % 7 == 6,
+                }
+                for i in range(self.server.repos_per_user)
+            ]
+            link = None
+        elif len(path) == 4 and path[0] == "repos" and path[3] in ("commits", "branches"):
+            payload = [{"sha": hashlib.sha1(self.path.encode()).hexdigest()}]
+            last = 120 if path[3] == "commits" else 4
+            link = f'<{self.server.base_url}/{"/".join(path)}?per_page=1&page={last}>; rel="last"'
+        else:
+            return self.send_json(404, {"message": "Not Found"})
+
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if failure is None and self.headers.get("If-None-Match") == etag:
+            return self.send_json(304, None, {"ETag": etag, **self.server.rate_headers(spend=False)[0]})
+
+        rate_headers, exhausted = self.server.rate_headers(spend=True)
+        if exhausted and failure is None:
+            self.server.count("rate_limited")
+        if exhausted or failure == "rate_limited":
+            return self.send_json(403, {"message": "API rate limit exceeded"}, rate_headers)
+        if failure == "error":
+            return self.send_json(502, {"message": "Server Error"}, rate_headers)
+
+        headers = {"ETag": etag, **rate_headers}
+        if link:
+            headers["Link"] = link
+        self.send_json(200, payload, headers)
+
+
+class FakeServer(ThreadingHTTPServer):
+    """A threaded fake API server with its own latency, failure rates and counters."""
+
+    daemon_threads = True
+
+    def __init__(self, handler, port: int = 0, latency: str = "fixed:0", error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, rate_limit: int = 5000, rate_window: float = 3600.0,
+                 repos_per_user: int = 10):
+        super().__init__(("127.0.0.1", port), handler)
+        self.latency = Latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.repos_per_user = repos_per_user
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._used = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def rate_headers(self, spend: bool) -> tuple[dict, bool]:
+        """X-RateLimit-* headers for the current window and whether it was already spent."""
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.rate_window:
+                self._window_start, self._used = now, 0
+            exhausted = self._used >= self.rate_limit
+            if spend and not exhausted:
+                self._used += 1
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.rate_limit - self._used),
+                "X-RateLimit-Used": str(self._used),
+                "X-RateLimit-Reset": str(int(self._window_start + self.rate_window)),
+            }
+            return headers, exhausted
+
+    def start(self) -> "FakeServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def start_fakes(args) -> tuple[FakeServer, FakeServer]:
+    """Start both fakes from parsed add_arguments() options."""
+    gemini = FakeServer(
+        FakeGeminiHandler, args.gemini_port, args.gemini_latency,
+        args.gemini_error_rate, args.gemini_rate_limit_rate,
+    ).start()
+    github = FakeServer(
+        FakeGitHubHandler, args.github_port, args.github_latency,
+        args.github_error_rate, args.github_rate_limit_rate,
+        rate_limit=args.github_rate_limit, rate_window=args.github_rate_window,
+    ).start()
+    return gemini, github
+
+
+def fake_environment(gemini: FakeServer, github: FakeServer) -> dict[str, str]:
+    """Environment variables that point the app at the fakes."""
+    return {
+        "GEMINI_API_KEY": "fake-key",
+        "GEMINI_API_ENDPOINT": gemini.base_url,
+        "GITHUB_API_URL": github.base_url,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--gemini-port", type=int, default=0, help="Port for the fake Gemini API (default: any free port)")
+    parser.add_argument("--gemini-latency", default="lognormal:0.8:0.4", help="Gemini response latency spec")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0, help="Fraction of Gemini calls answered with 500")
+    parser.add_argument("--gemini-rate-limit-rate", type=float, default=0.0, help="Fraction of Gemini calls answered with 429")
+    parser.add_argument("--github-port", type=int, default=0, help="Port for the fake GitHub API (default: any free port)")
+    parser.add_argument("--github-latency", default="lognormal:0.15:0.4", help="GitHub response latency spec")
+    parser.add_argument("--github-error-rate", type=float, default=0.0, help="Fraction of GitHub calls answered with 502")
+    parser.add_argument("--github-rate-limit-rate", type=float, default=0.0, help="Fraction of GitHub calls answered with 403 rate limit")
+    parser.add_argument("--github-rate-limit", type=int, default=5000, help="GitHub requests allowed per window")
+    parser.add_argument("--github-rate-window", type=float, default=3600.0, help="GitHub rate-limit window in seconds")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run fake Gemini and GitHub APIs for load testing.")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    gemini, github = start_fakes(args)
+    print("Fake APIs running; start the app with:")
+    for name, value in fake_environment(gemini, github).items():
+        print(f"  export {name}={value}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"gemini {gemini.stats}  github {github.stats}")
+    except KeyboardInterrupt:
+        gemini.shutdown()
+        github.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Load test for /generate, /preview and /generate-portfolio.
+
+By default the app is started in this process on a threaded server, wired to
+the fake Gemini and GitHub APIs from fakes.py, with its caches and artifacts
+in a temporary directory. Pass --target to drive an app you started yourself
+(for example under gunicorn with several workers, using the environment
+printed by fakes.py).
+
+Each virtual user sends requests back to back, so --users is the number of
+requests in flight. Throughput and p50/p95/p99 latency are reported per endpoint.
+
+Usage (from Flask-API/):
+    python benchmarks/loadtest.py --users 16 --duration 60
+    python benchmarks/loadtest.py --mix generate=1,preview=4 --gemini-latency lognormal:2:0.6
+    python benchmarks/loadtest.py --target http://127.0.0.1:8000 --users 64 --output output/load.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+# Only modules that do not import the app: its settings are read from the
+# environment at import time, which start_app() fills in first
+import fakes  # noqa: E402
+from portfolios import synthetic_portfolio  # noqa: E402
+
+ENDPOINTS = ("generate", "preview", "generate-portfolio")
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Endpoint weights from "generate=1,preview=3"."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+
+class Payloads:
+    """
+    Request bodies built from a synthetic portfolio.
+
+    Every body gets a distinct name, about text and GitHub user unless
+    `distinct` is set, in which case bodies repeat after that many and the
+    app's caches start to hit.
+    """
+
+    def __init__(self, size: str, distinct: int, github_share: float):
+        self.base = synthetic_portfolio(size)
+        self.distinct = distinct
+        self.github_share = github_share
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> dict:
+        with self._lock:
+            self._counter += 1
+            n = self._counter % self.distinct if self.distinct else self._counter
+        data = json.loads(json.dumps(self.base))
+        data["name"] = f"Load User {n}"
+        data["about"] = f"{data['about']} ({n})"
+        data["githubUrl"] = f"https://github.com/load-user-{n}"
+        if random.Random(n).random() < self.github_share:
+            data["projects"] = []  # make the pipeline fetch them from GitHub
+        return data
+
+    def request(self, endpoint: str) -> dict:
+        data = self.next()
+        if endpoint == "preview":
+            return {"templateName": "Modern", "data": data}
+        if endpoint == "generate":
+            data["templateName"] = "Modern"
+        return data
+
+
+def run_user(base_url: str, mix: dict, payloads: Payloads, deadline: float, results: dict, lock: threading.Lock, timeout: float):
+    """One virtual user: send requests back to back until the deadline."""
+    session = requests.Session()
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        endpoint = random.choices(names, weights)[0]
+        body = payloads.request(endpoint)
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{base_url}/{endpoint}", json=body, timeout=timeout)
+            response.content  # include body transfer (and streamed previews) in the latency
+            outcome = response.status_code
+        except requests.RequestException as e:
+            outcome = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            results[endpoint].append((elapsed, outcome))
+
+
+def summarize(results: dict, wall_seconds: float) -> dict:
+    """Per-endpoint and overall throughput, error counts and latency percentiles (ms)."""
+    summary = {}
+    everything = []
+    for endpoint, samples in list(results.items()) + [("all", None)]:
+        if samples is None:
+            samples = everything
+        else:
+            everything.extend(samples)
+        latencies = sorted(elapsed for elapsed, _ in samples)
+        outcomes = defaultdict(int)
+        for _, outcome in samples:
+            outcomes[str(outcome)] += 1
+        ok = sum(n for outcome, n in outcomes.items() if outcome.isdigit() and int(outcome) < 400)
+        summary[endpoint] = {
+            "requests": len(samples),
+            "ok": ok,
+            "errors": len(samples) - ok,
+            "throughput_rps": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "outcomes": dict(outcomes),
+        }
+    return summary
+
+
+def start_app(env: dict[str, str], workdir: str) -> tuple[str, object]:
+    """Start the app in this process on a threaded server, configured by env."""
+    os.environ.update(env)
+    os.environ.setdefault("CACHE_DB_PATH", os.path.join(workdir, "cache.sqlite3"))
+    os.environ.setdefault("ARTIFACT_DIR", os.path.join(workdir, "artifacts"))
+    os.chdir(APP_DIR)
+
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no access log line per request
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Drive the portfolio API at a fixed concurrency and report latency.")
+    parser.add_argument("--target", help="Base URL of a running app; omit to start one in-process against the fakes")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("generate=1,preview=2,generate-portfolio=1"), help="Endpoint weights")
+    parser.add_argument("--size", choices=["small", "typical", "huge"], default="typical", help="Synthetic portfolio size")
+    parser.add_argument("--distinct", type=int, default=0, help="Repeat bodies after this many (0: every body is new)")
+    parser.add_argument("--github-share", type=float, default=0.5, help="Fraction of bodies without projects, so GitHub is fetched")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request in seconds")
+    parser.add_argument("--output", help="Write the summary as JSON to this file")
+    fakes.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    gemini = github = server = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        gemini, github = fakes.start_fakes(args)
+        base_url, server = start_app(fakes.fake_environment(gemini, github), tempfile.mkdtemp(prefix="loadtest-"))
+    print(f"Driving {base_url} with {args.users} users for {args.duration:.0f}s, mix {args.mix}")
+
+    payloads = Payloads(args.size, args.distinct, args.github_share)
+    results = {endpoint: [] for endpoint in args.mix}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    started = time.perf_counter()
+    users = [
+        threading.Thread(target=run_user, args=(base_url, args.mix, payloads, deadline, results, lock, args.timeout), daemon=True)
+        for _ in range(args.users)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    summary = summarize(results, time.perf_counter() - started)
+
+    print(f"{'endpoint':20s} {'reqs':>6s} {'errors':>6s} {'rps':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for endpoint, row in summary.items():
+        print(f"{endpoint:20s} {row['requests']:6d} {row['errors']:6d} {row['throughput_rps']:8.2f} "
+              f"{row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f}")
+        if row["errors"]:
+            print(f"{'':20s} outcomes: {row['outcomes']}")
+    if gemini:
+        print(f"fake gemini {gemini.stats}  fake github {github.stats}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "target": base_url,
+                "users": args.users,
+                "duration": args.duration,
+                "mix": args.mix,
+                "upstream": None if args.target else {"gemini": gemini.stats, "github": github.stats},
+                "endpoints": summary,
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    for running in (server, gemini, github):
+        if running:
+            running.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Deterministic synthetic portfolios shared by the benchmarks and the load test."""
+
+# (projects, experiences, achievements, certifications, skills) per portfolio size
+SIZES = {
+    "small": (1, 1, 1, 1, 3),
+    "typical": (6, 4, 5, 4, 10),
+    "huge": (60, 30, 50, 40, 80),
+}
+
+LOREM = (
+    "Built a scalable service with Python, React and PostgreSQL that handles thousands of "
+    "requests per second, cut latency by 40 percent and shipped with full test coverage. "
+)
+
+
+def synthetic_portfolio(size: str) -> dict:
+    """A deterministic portfolio with the number of entries given by SIZES[size]."""
+    projects, experiences, achievements, certifications, skills = SIZES[size]
+    experience = [
+        {
+            "role": f"Software Engineer {i}",
+            "companyName": f"Company {i}",
+            "duration": f"{2015 + i % 10} - {2016 + i % 10}",
+            "description": LOREM * 2,
+        }
+        for i in range(experiences)
+    ]
+    return {
+        "name": "Alex Johnson",
+        "about": LOREM * 3,
+        "education": "Bachelor of Science in Computer Science, Stanford University (2020-2024)",
+        "degree": "B.Sc. Computer Science",
+        "collegeName": "Stanford University",
+        "yearOfPassing": "2024",
+        "email": "alex@example.com",
+        "mobile": "+1 555 0100",
+        "githubUrl": "https://github.com/alexjohnson",
+        "linkedinUrl": "https://linkedin.com/in/alexjohnson",
+        "skills": [{"name": f"Skill {i}", "percentage": 60 + i % 40} for i in range(skills)],
+        "projects": [
+            {
+                "name": f"Project {i}",
+                "description": LOREM,
+                "url": f"https://github.com/alexjohnson/project-{i}",
+                "language": ["Python", "JavaScript", "Go"][i % 3],
+                "commits": 10 * i,
+                "branches": i % 5 + 1,
+            }
+            for i in range(projects)
+        ],
+        "experience": experience,
+        "experiences": experience,
+        "achievements": [f"Achievement {i}: {LOREM}" for i in range(achievements)],
+        "certifications": [f"Certification {i}: Cloud Architecture" for i in range(certifications)],
+    }
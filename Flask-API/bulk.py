@@ -0,0 +1,243 @@
+"""
+Bulk portfolio generation for whole cohorts.
+
+Reads records shaped like data/sample-data.json from a JSONL file, a JSON
+array or a single JSON object, fetches GitHub projects, enhances every
+distinct field once across all records in batched requests, renders on a
+process pool and streams each result to a directory or a zip/tar archive as
+soon as it is ready.
+
+Usage:
+    python bulk.py cohort.jsonl --output-dir output/bulk
+    python bulk.py cohort.json --archive output/cohort.zip --template Creative
+"""
+import os
+import re
+import io
+import sys
+import json
+import time
+import copy
+import tarfile
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from Portfolio import logs, renderer, scheduler
+from Portfolio.enhancer import enhance_fields
+from Portfolio.registry import templates
+from Portfolio.schema import ValidationError
+import pipeline
+
+
+def read_records(path: str) -> list[dict]:
+    """
+    Load records from a JSON array, a single JSON object such as
+    data/sample-data.json, or a JSONL file (one object per line).
+
+    Raises:
+        ValueError: If the file is none of these, naming the offending line.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        document = json.loads(text)
+    except ValueError:
+        records = []
+        for number, line in enumerate(text.splitlines(), 1):
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError as e:
+                    raise ValueError(f"{path}:{number}: not a JSON array, JSON object or JSONL record ({e})") from None
+    else:
+        records = [document] if isinstance(document, dict) else document
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError(f"{path}: records must be JSON objects")
+    return records
+
+
+def record_name(record: dict, index: int) -> str:
+    """Filesystem-safe name for a record's output file."""
+    base = str(record.get("id") or record.get("name") or "portfolio")
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", base).strip("-").lower() or "portfolio"
+    return f"{index + 1:05d}-{slug}"
+
+
+def enhance_records(records: list[dict], batch_size: int) -> int:
+    """
+    Enhance the fields of every record in place, sending each distinct
+    (instruction, content) pair to the model only once.
+
+    Returns:
+        int: Number of distinct fields enhanced.
+    """
+    per_record = [pipeline.collect_fields(record) for record in records]
+    unique = list(dict.fromkeys(pair for fields in per_record for pair in fields.values()))
+
+    enhanced = {}
+    for start in range(0, len(unique), batch_size):
+        chunk = unique[start:start + batch_size]
+        results = enhance_fields({f"field_{i}": pair for i, pair in enumerate(chunk)})
+        enhanced.update((pair, results[f"field_{i}"]) for i, pair in enumerate(chunk))
+
+    for record, fields in zip(records, per_record):
+        pipeline.apply_enhanced(record, {field_id: enhanced[pair] for field_id, pair in fields.items()})
+    return len(unique)
+
+
+def _render(template_file: str, data: dict) -> str:
+    """Process pool entry point: render one record with the shared template registry."""
+    return renderer.render_template(template_file, data)
+
+
+class OutputSink:
+    """Writes rendered portfolios to a directory, a zip archive or a tar archive."""
+
+    def __init__(self, output_dir: str | None = None, archive: str | None = None):
+        self.output_dir = output_dir
+        self.archive_path = archive
+        self._zip = None
+        self._tar = None
+        if archive:
+            os.makedirs(os.path.dirname(os.path.abspath(archive)), exist_ok=True)
+            if archive.endswith(".zip"):
+                self._zip = zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED)
+            else:
+                mode = "w:gz" if archive.endswith((".tar.gz", ".tgz")) else "w"
+                self._tar = tarfile.open(archive, mode)
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, name: str, html_content: str) -> str:
+        """Store one portfolio and return where it went."""
+        filename = f"{name}.html"
+        if self._zip:
+            self._zip.writestr(filename, html_content)
+            return f"{self.archive_path}:{filename}"
+        if self._tar:
+            payload = html_content.encode("utf-8")
+            info = tarfile.TarInfo(filename)
+            info.size = len(payload)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(payload))
+            return f"{self.archive_path}:{filename}"
+        path = os.path.join(self.output_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+        return path
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+        if self._tar:
+            self._tar.close()
+
+
+def run(records: list[dict], sink: OutputSink, default_template: str = "Modern",
+        workers: int | None = None, batch_size: int = 20, report=print) -> list[dict]:
+    """
+    Generate a portfolio for every record.
+
+    Args:
+        records (list[dict]): Portfolio records; "templateName" overrides default_template.
+        sink (OutputSink): Destination for rendered HTML.
+        default_template (str): Template name for records without one.
+        workers (int | None): Render processes, defaults to the CPU count.
+        batch_size (int): Distinct fields per enhancement request.
+        report (callable): Receives one progress line per record.
+
+    Returns:
+        list[dict]: One status entry per record, in input order.
+    """
+    total = len(records)
+    statuses = [
+        {"index": i, "name": record_name(r if isinstance(r, dict) else {}, i), "status": "pending"}
+        for i, r in enumerate(records)
+    ]
+    valid = []
+    done = 0
+
+    for status, record in zip(statuses, records):
+        if not isinstance(record, dict) or not record.get("name"):
+            status.update(status="failed", error="Record with name is required")
+        else:
+            template_name = record.get("templateName", default_template)
+            template = templates.get(template_name)
+            if not template or not template["available"]:
+                status.update(status="failed", error=f"Template {template_name} not supported")
+            else:
+                data = copy.deepcopy(record)
+                data.pop("templateName", None)
+                try:
+                    data = template["validate"](data)
+                except ValidationError as e:
+                    status.update(status="failed", error=str(e))
+                else:
+                    status["template_file"] = template["file"]
+                    valid.append((status, data))
+        if status["status"] == "failed":
+            done += 1
+            report(f"[{done}/{total}] {status['name']}: failed ({status['error']})")
+
+    # GitHub fetches are I/O bound, so they share threads rather than processes
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(pipeline.fetch_projects, [data for _, data in valid]))
+    report(f"Fetched GitHub projects in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    # Cohort runs leave part of the shared Gemini quota to interactive requests
+    with scheduler.priority_scope(scheduler.BULK):
+        distinct = enhance_records([data for _, data in valid], batch_size)
+    report(f"Enhanced {distinct} distinct fields in {time.perf_counter() - started:.2f}s")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_render, status["template_file"], data): status for status, data in valid}
+        for future in as_completed(futures):
+            status = futures[future]
+            done += 1
+            try:
+                status["output"] = sink.write(status["name"], future.result())
+                status["status"] = "succeeded"
+                report(f"[{done}/{total}] {status['name']}: ok -> {status['output']}")
+            except Exception as e:
+                status.update(status="failed", error=str(e))
+                report(f"[{done}/{total}] {status['name']}: failed ({e})")
+
+    for status in statuses:
+        status.pop("template_file", None)
+    return statuses
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate portfolios for many records at once.")
+    parser.add_argument("input", help="JSONL file, JSON array or JSON object of portfolio records")
+    parser.add_argument("--output-dir", default=os.path.join("output", "bulk"), help="Directory for per-record HTML files")
+    parser.add_argument("--archive", help="Write a .zip, .tar or .tar.gz archive instead of a directory")
+    parser.add_argument("--template", default="Modern", help="Template for records without templateName")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=20, help="Distinct fields per enhancement request")
+    parser.add_argument("--report", help="Write per-record results as JSON to this file")
+    args = parser.parse_args(argv)
+    logs.configure()
+
+    try:
+        records = read_records(args.input)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    sink = OutputSink(args.output_dir, args.archive)
+    try:
+        statuses = run(records, sink, args.template, args.workers, args.batch_size)
+    finally:
+        sink.close()
+
+    failed = [s for s in statuses if s["status"] != "succeeded"]
+    print(f"✅ {len(statuses) - len(failed)} generated, ❌ {len(failed)} failed")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(statuses, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
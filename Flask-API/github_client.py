@@ -0,0 +1,340 @@
+import os
+import json
+import math
+import time
+import threading
+from urllib.parse import urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+from Portfolio import deadline, metrics
+from Portfolio.cache import SQLiteCache
+from Portfolio.logs import get_logger
+
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+# (connect, read) timeouts in seconds applied to every GitHub request
+TIMEOUT = (
+    float(os.getenv("GITHUB_CONNECT_TIMEOUT", "3")),
+    float(os.getenv("GITHUB_READ_TIMEOUT", "5")),
+)
+
+# Keep-alive connections kept per host; should cover MAX_CONCURRENCY
+POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "16"))
+
+# Maximum concurrent per-repo sub-requests for one fetch
+MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+
+# Seconds a cached response is served without asking GitHub, by endpoint type.
+# Past that it is revalidated with If-None-Match, and 304s do not count against the rate limit.
+FRESHNESS = {
+    "repos": float(os.getenv("GITHUB_FRESH_REPOS", "300")),
+    "commits": float(os.getenv("GITHUB_FRESH_COMMITS", "1800")),
+    "branches": float(os.getenv("GITHUB_FRESH_BRANCHES", "3600")),
+}
+DEFAULT_FRESHNESS = float(os.getenv("GITHUB_FRESH_DEFAULT", "300"))
+
+CACHE_ENABLED = os.getenv("GITHUB_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+response_cache = SQLiteCache(
+    "github",
+    ttl=float(os.getenv("GITHUB_CACHE_TTL", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "5000")),
+)
+
+# Response headers kept alongside a cached body
+CACHED_HEADERS = ("ETag", "Last-Modified", "Link")
+
+# Request priorities: CORE calls (the repo list) may spend the whole budget,
+# OPTIONAL ones (per-repo commit and branch counts) stop at RATE_LIMIT_RESERVE
+CORE = "core"
+OPTIONAL = "optional"
+
+# Fraction of the hourly limit (X-RateLimit-Limit) kept for CORE calls until the budget
+# resets: 6 of the 60 unauthenticated requests, 500 of an authenticated 5000
+RATE_LIMIT_RESERVE = float(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "0.1"))
+
+# Last rate-limit budget GitHub reported to any worker
+rate_limit_store = SQLiteCache("github_rate_limit")
+
+# OPTIONAL requests held back for lack of budget, sent again once it resets:
+# cache key -> [path, params]
+deferred_store = SQLiteCache("github_deferred", ttl=24 * 3600, max_entries=1000)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+# This process's timer for replaying deferred requests, and the reset time it fires at
+_refresh_timer = None
+_refresh_at = 0.0
+_refresh_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session, creating it on first use.
+
+    A forked worker gets a fresh session instead of sharing the parent's sockets.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Accept": "application/vnd.github+json",
+                    "User-Agent": "PathBridge-Portfolio-Generator",
+                })
+                if GITHUB_TOKEN:
+                    session.headers["Authorization"] = f"token {GITHUB_TOKEN}"
+                _session = session
+                _session_pid = os.getpid()
+    return _session
+
+
+class GitHubResponse:
+    """The parts of a GitHub API response callers rely on, live or from the cache."""
+
+    def __init__(self, status_code: int, headers: dict, text: str, from_cache: bool = False):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.text = text
+        self.from_cache = from_cache
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"GitHub API returned {self.status_code}")
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Raised instead of sending a request the remaining GitHub budget is not kept for."""
+
+
+def endpoint_type(path: str) -> str:
+    """Endpoint type used to pick a freshness TTL, e.g. "/repos/a/b/commits" -> "commits"."""
+    return path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _cache_key(url: str, params: dict | None) -> str:
+    return f"{url}?{urlencode(sorted((params or {}).items()))}"
+
+
+def rate_limit() -> tuple[int, float, int | None] | None:
+    """
+    The request budget GitHub last reported to any worker.
+
+    Returns:
+        tuple[int, float, int | None] | None: (remaining, reset epoch seconds,
+            hourly limit if known), or None if unknown or the reset time has passed.
+    """
+    record = rate_limit_store.get("core")
+    if not record:
+        return None
+    remaining, reset, *rest = json.loads(record)
+    return (remaining, reset, rest[0] if rest else None) if reset > time.time() else None
+
+
+def _reserved(priority: str, limit: int | None) -> int:
+    """Requests that must be left in a budget of this hourly limit before one of this priority is sent."""
+    if priority == CORE or not limit:
+        return 0
+    return math.ceil(limit * RATE_LIMIT_RESERVE)
+
+
+def allows(priority: str = CORE) -> bool:
+    """Whether the shared budget still has room for a request of this priority."""
+    budget = rate_limit()
+    return budget is None or budget[0] > _reserved(priority, budget[2])
+
+
+def _record_rate_limit(status_code: int, headers):
+    """Share GitHub's remaining request budget from a live response's headers with every worker."""
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    limit = headers.get("X-RateLimit-Limit")
+    retry_after = headers.get("Retry-After")
+    if status_code in (403, 429) and retry_after and retry_after.isdigit():
+        # Secondary rate limit: nothing may be sent until Retry-After has passed
+        remaining, reset = "0", str(int(time.time()) + int(retry_after))
+    if not (remaining and remaining.isdigit() and reset and reset.isdigit()):
+        return
+    remaining, reset = int(remaining), int(reset)
+    budget = rate_limit()
+    limit = int(limit) if limit and limit.isdigit() else (budget[2] if budget else None)
+    if budget and budget[1] == reset:
+        # Responses from concurrent requests can arrive out of order; the budget only shrinks within a window
+        remaining = min(remaining, budget[0])
+    rate_limit_store.set("core", json.dumps([remaining, reset, limit]))
+    metrics.github_rate_limit_remaining.set(remaining)
+    metrics.github_rate_limit_reset.set(reset)
+
+
+def _send(path: str, url: str, params: dict | None, headers: dict | None, timeout, priority: str = CORE):
+    """One live request over the shared session, recorded in the GitHub metrics."""
+    kind = endpoint_type(path)
+    budget = rate_limit()
+    if budget and budget[0] <= _reserved(priority, budget[2]):
+        metrics.github_requests.inc(endpoint=kind, result="budget")
+        raise RateLimitExceeded(f"GitHub rate limit budget too low for {priority} request ({budget[0]} left until {int(budget[1])})")
+    try:
+        # Never wait past the current request's deadline
+        timeout = deadline.clamp(timeout or TIMEOUT)
+    except deadline.DeadlineExceeded as e:
+        metrics.github_requests.inc(endpoint=kind, result="deadline")
+        raise requests.Timeout(str(e)) from e
+    start = time.perf_counter()
+    try:
+        response = get_session().get(url, params=params, headers=headers, timeout=timeout)
+    except requests.RequestException:
+        metrics.github_requests.inc(endpoint=kind, result="error")
+        raise
+    finally:
+        metrics.github_request_seconds.observe(time.perf_counter() - start, endpoint=kind)
+    metrics.github_requests.inc(endpoint=kind, result=str(response.status_code))
+    _record_rate_limit(response.status_code, response.headers)
+    return response
+
+
+def get(path: str, params: dict | None = None, timeout=None, priority: str = CORE) -> GitHubResponse:
+    """
+    GET a GitHub API path (e.g. "/users/octocat/repos") over the shared session.
+
+    Successful responses are cached with their ETag/Last-Modified. A cached
+    response younger than its endpoint's freshness TTL is returned without a
+    request; an older one is revalidated with a conditional request. If GitHub
+    cannot be reached, a stale cached response is returned instead.
+
+    When the shared rate-limit budget is down to RATE_LIMIT_RESERVE, OPTIONAL
+    requests are not sent: a stale cached response is served, and the request
+    is deferred and sent once the budget resets. CORE requests stop only when
+    the budget is spent.
+
+    Raises:
+        RateLimitExceeded: If the budget does not allow the request and nothing is cached.
+        requests.RequestException: On connection errors and timeouts with nothing cached.
+            Timeouts are cut short by the request deadline, if one is set.
+    """
+    url = f"{GITHUB_API_URL}{path}"
+    if not CACHE_ENABLED:
+        response = _send(path, url, params, None, timeout, priority)
+        return GitHubResponse(response.status_code, response.headers, response.text)
+
+    key = _cache_key(url, params)
+    entry = response_cache.get_entry(key)
+    cached = json.loads(entry[0]) if entry else None
+    if cached and time.time() - entry[1] < FRESHNESS.get(endpoint_type(path), DEFAULT_FRESHNESS):
+        metrics.github_requests.inc(endpoint=endpoint_type(path), result="fresh")
+        return GitHubResponse(200, cached["headers"], cached["body"], from_cache=True)
+
+    conditional = {}
+    if cached:
+        if cached["headers"].get("ETag"):
+            conditional["If-None-Match"] = cached["headers"]["ETag"]
+        if cached["headers"].get("Last-Modified"):
+            conditional["If-Modified-Since"] = cached["headers"]["Last-Modified"]
+
+    try:
+        response = _send(path, url, params, conditional, timeout, priority)
+    except RateLimitExceeded:
+        if priority == OPTIONAL:
+            _defer(key, path, params)
+        if cached:
+            # Refresh it once the budget resets
+            metrics.github_requests.inc(endpoint=endpoint_type(path), result="deferred")
+            return GitHubResponse(200, cached["headers"], cached["body"], from_cache=True)
+        raise
+    except requests.RequestException as e:
+        if cached:
+            logger.warning("GitHub unreachable, serving stale response", path=path, error=str(e))
+            metrics.github_requests.inc(endpoint=endpoint_type(path), result="stale")
+            return GitHubResponse(200, cached["headers"], cached["body"], from_cache=True)
+        raise
+
+    if response.status_code == 304 and cached:
+        # Still valid: restart its freshness window
+        response_cache.set(key, entry[0])
+        return GitHubResponse(200, cached["headers"], cached["body"], from_cache=True)
+
+    if response.status_code == 200:
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        response_cache.set(key, json.dumps({"headers": headers, "body": response.text}))
+
+    return GitHubResponse(response.status_code, response.headers, response.text)
+
+
+def _defer(key: str, path: str, params: dict | None):
+    """Queue an OPTIONAL request held back by the budget, to be sent by this process once it resets."""
+    global _refresh_timer, _refresh_at
+    deferred_store.set(key, json.dumps([path, params]))
+    budget = rate_limit()
+    reset = budget[1] if budget else time.time()
+    with _refresh_lock:
+        if _refresh_timer is not None and _refresh_timer.is_alive() and _refresh_at <= reset:
+            return
+        if _refresh_timer is not None:
+            _refresh_timer.cancel()
+        # A second past the reset, so GitHub's new window has started
+        _refresh_timer = threading.Timer(max(0.0, reset - time.time()) + 1, refresh_deferred)
+        _refresh_timer.daemon = True
+        _refresh_timer.start()
+        _refresh_at = reset
+
+
+def refresh_deferred() -> int:
+    """
+    Send the deferred requests, refreshing their cached responses.
+
+    Any that the new budget does not allow are deferred again.
+
+    Returns:
+        int: Number of requests sent.
+    """
+    sent = 0
+    for key, value in deferred_store.items():
+        # Removed first so workers replaying at the same time do not all send it
+        deferred_store.delete(key)
+        path, params = json.loads(value)
+        if not allows(OPTIONAL):
+            _defer(key, path, params)
+            continue
+        try:
+            get(path, params, priority=OPTIONAL)
+            sent += 1
+        except requests.RequestException as e:
+            logger.debug("Deferred GitHub request failed", path=path, error=str(e))
+    if sent:
+        logger.info("Sent deferred GitHub requests", sent=sent)
+    return sent
+
+
+def invalidate(username: str | None = None) -> int:
+    """
+    Drop cached GitHub responses.
+
+    Args:
+        username (str | None): Only drop responses for this user's profile and
+            repositories. Drops everything when omitted.
+
+    Returns:
+        int: Number of entries removed (0 when clearing everything).
+    """
+    if username is None:
+        response_cache.clear()
+        return 0
+    return (
+        response_cache.delete_prefix(f"{GITHUB_API_URL}/users/{username}/")
+        + response_cache.delete_prefix(f"{GITHUB_API_URL}/repos/{username}/")
+    )
@@ -1,14 +1,43 @@
+import re
 import requests
-import os
-from dotenv import load_dotenv
-from Portfolio.enhancer import enhance_content
+from concurrent.futures import ThreadPoolExecutor
+import github_client
+from Portfolio.enhancer import enhance_many
+from Portfolio.logs import bind_context, get_logger
 
-# Load environment variables
-load_dotenv()
+logger = get_logger(__name__)
+
+
+def username_from_url(github_url: str) -> str:
+    """Extract the username from a GitHub profile URL such as https://github.com/octocat"""
+    return github_url.split('github.com/')[1].split('/')[0]
+
+
+def fetch_repo_summaries(username: str, per_page: int = 6) -> list[dict]:
+    """
+    Fetch the most recently updated non-fork repositories with one request.
+
+    Args:
+        username (str): GitHub username.
+        per_page (int): Number of repositories to request.
+
+    Returns:
+        list[dict]: name, description, url and language for each repository.
+    """
+    try:
+        response = github_client.get(f"/users/{username}/repos", params={"sort": "updated", "per_page": per_page})
+        if response.status_code != 200:
+            return []
+        return [{
+            'name': repo['name'],
+            'description': repo['description'] or f"A {repo['language']} project",
+            'url': repo['html_url'],
+            'language': repo['language']
+        } for repo in response.json() if not repo['fork']]
+    except requests.RequestException as e:
+        logger.warning("Error fetching GitHub repos", username=username, error=str(e))
+        return []
 
-# GitHub token for authentication
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
 
 def fetch_github_repos(username: str, max_repos: int = 6) -> list[dict]:
     """
@@ -21,82 +50,97 @@ def fetch_github_repos(username: str, max_repos: int = 6) -> list[dict]:
     Returns:
         list[dict]: List of top repository details prioritized by stars, forks, and activity.
     """
-    url = f"https://api.github.com/users/{username}/repos?sort=updated&per_page=30"
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = github_client.get(f"/users/{username}/repos", params={"sort": "updated", "per_page": 30})
         response.raise_for_status()
         repos = response.json()
 
         # Filter out forks and empty repos, then prioritize
         filtered_repos = [
-            repo for repo in repos 
+            repo for repo in repos
             if not repo.get("fork", False) and repo.get("size", 0) > 0
         ]
-        
+
         # Sort by priority: stars + forks + (recent activity boost)
         def priority_score(repo):
             stars = repo.get("stargazers_count", 0)
             forks = repo.get("forks_count", 0)
             return stars * 2 + forks
-        
-        sorted_repos = sorted(filtered_repos, key=priority_score, reverse=True)
-
-        projects = []
-        for repo in sorted_repos[:max_repos]:
-            description = repo.get("description", "")
-            if not description:
-                # Generate description based on repo name and language
-                repo_name = repo.get("name", "")
-                language = repo.get("language", "")
-                description = enhance_content(
-                    f"Create a professional project description for a {language} repository named '{repo_name}'. Make it concise and highlight potential features:",
-                    f"{repo_name} - {language} project"
+
+        top_repos = sorted(filtered_repos, key=priority_score, reverse=True)[:max_repos]
+
+        # Fetch commits and branches counts for every repo at once; with little
+        # rate-limit budget left only cached counts are used
+        if not github_client.allows(github_client.OPTIONAL):
+            logger.info("GitHub rate limit budget low, using cached repo counts only", username=username, budget=github_client.rate_limit())
+        repo_names = [repo.get("name", "") for repo in top_repos]
+        with ThreadPoolExecutor(max_workers=max(1, min(github_client.MAX_CONCURRENCY, 2 * len(repo_names)))) as executor:
+            commits_futures = [executor.submit(bind_context(get_commits_count), username, name) for name in repo_names]
+            branches_futures = [executor.submit(bind_context(get_branches_count), username, name) for name in repo_names]
+
+            # Generate descriptions based on repo name and language while the counts load
+            missing = [repo for repo in top_repos if not repo.get("description")]
+            generated = enhance_many([
+                (
+                    f"Create a professional project description for a {repo.get('language', '')} repository named '{repo.get('name', '')}'. Make it concise and highlight potential features:",
+                    f"{repo.get('name', '')} - {repo.get('language', '')} project"
                 )
-            
-            # Fetch commits and branches count
-            repo_name = repo.get("name", "")
-            commits_count = get_commits_count(username, repo_name)
-            branches_count = get_branches_count(username, repo_name)
-            
-            projects.append({
-                "name": repo.get("name", ""),
-                "description": description,
-                "url": repo.get("html_url", ""),
-                "language": repo.get("language", "Not specified"),
-                "commits": commits_count,
-                "branches": branches_count,
-            })
+                for repo in missing
+            ])
+            descriptions = {id(repo): description for repo, description in zip(missing, generated)}
+
+            projects = []
+            for repo, commits_future, branches_future in zip(top_repos, commits_futures, branches_futures):
+                project = {
+                    "name": repo.get("name", ""),
+                    "description": repo.get("description") or descriptions.get(id(repo), ""),
+                    "url": repo.get("html_url", ""),
+                    "language": repo.get("language", "Not specified"),
+                }
+                # Counts that could not be fetched are left out rather than shown as 0
+                commits, branches = commits_future.result(), branches_future.result()
+                if commits is not None and branches is not None:
+                    project.update(commits=commits, branches=branches)
+                projects.append(project)
         return projects
 
     except requests.RequestException as e:
-        print(f"Error fetching GitHub repos: {e}")
+        logger.warning("Error fetching GitHub repos", username=username, error=str(e))
         return []
 
-def get_commits_count(username: str, repo_name: str) -> int:
-    """Get total commits count for a repository"""
+
+def _count_from_link(response: requests.Response) -> int | None:
+    """Total item count of a per_page=1 listing, read from its rel="last" link."""
+    match = re.search(r'[?&]page=(\d+)>; rel="last"', response.headers.get('Link', ''))
+    return int(match.group(1)) if match else None
+
+
+def get_commits_count(username: str, repo_name: str) -> int | None:
+    """Get total commits count for a repository, or None if it could not be fetched"""
     try:
-        url = f"https://api.github.com/repos/{username}/{repo_name}/commits?per_page=1"
-        response = requests.get(url, headers=headers, timeout=5)
+        response = github_client.get(f"/repos/{username}/{repo_name}/commits", params={"per_page": 1}, priority=github_client.OPTIONAL)
         if response.status_code == 200:
             # Get total count from Link header if available
-            link_header = response.headers.get('Link', '')
-            if 'last' in link_header:
-                import re
-                match = re.search(r'page=(\d+)>; rel="last"', link_header)
-                if match:
-                    return int(match.group(1))
-        return 0
-    except:
-        return 0
-
-def get_branches_count(username: str, repo_name: str) -> int:
-    """Get total branches count for a repository"""
+            count = _count_from_link(response)
+            if count is not None:
+                return count
+            return len(response.json())
+        return None
+    except Exception as e:
+        logger.debug("Commit count unavailable", repo=f"{username}/{repo_name}", error=str(e))
+        return None
+
+
+def get_branches_count(username: str, repo_name: str) -> int | None:
+    """Get total branches count for a repository, or None if it could not be fetched"""
     try:
-        url = f"https://api.github.com/repos/{username}/{repo_name}/branches"
-        response = requests.get(url, headers=headers, timeout=5)
+        response = github_client.get(f"/repos/{username}/{repo_name}/branches", params={"per_page": 1}, priority=github_client.OPTIONAL)
         if response.status_code == 200:
-            branches = response.json()
-            return len(branches)
-        return 0
-    except:
-        return 0
+            count = _count_from_link(response)
+            if count is not None:
+                return count
+            return len(response.json())
+        return None
+    except Exception as e:
+        logger.debug("Branch count unavailable", repo=f"{username}/{repo_name}", error=str(e))
+        return None
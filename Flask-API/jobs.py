@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Portfolio import deadline, scheduler
+from Portfolio.cache import SQLiteCache
+from Portfolio.logs import bind_context, get_logger, request_id
+
+logger = get_logger(__name__)
+
+# Background workers running generation jobs per process
+MAX_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+
+# Jobs waiting or running per process before new submissions are refused
+MAX_PENDING = int(os.getenv("JOB_QUEUE_LIMIT", "100"))
+
+# Seconds a job may spend on GitHub and Gemini, replacing the submitting request's deadline; 0 disables it
+JOB_DEADLINE = float(os.getenv("JOB_DEADLINE", "300"))
+
+# Job records live in the shared SQLite store so any worker can report on them
+job_store = SQLiteCache(
+    "jobs",
+    ttl=float(os.getenv("JOB_TTL", str(24 * 3600))),
+    max_entries=int(os.getenv("JOB_MAX_RECORDS", "10000")),
+)
+
+_executor = None
+_executor_pid = None
+_pending = 0
+_lock = threading.Lock()
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another submission."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return this process's worker pool; a forked worker starts its own."""
+    global _executor, _executor_pid, _pending
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="job")
+        _executor_pid = os.getpid()
+        _pending = 0
+    return _executor
+
+
+def _save(job: dict):
+    job_store.set(job['id'], json.dumps(job))
+
+
+def get_job(job_id: str) -> dict | None:
+    """Return the job record, or None if it is unknown or expired."""
+    record = job_store.get(job_id)
+    return json.loads(record) if record else None
+
+
+def _run(job: dict, func, args: tuple):
+    global _pending
+    job['status'] = 'running'
+    job['started_at'] = time.time()
+    job['queue_seconds'] = round(job['started_at'] - job['submitted_at'], 4)
+    _save(job)
+
+    timings = {}
+    try:
+        # Queued work yields Gemini quota to interactive requests
+        with deadline.scope(JOB_DEADLINE if JOB_DEADLINE > 0 else None), scheduler.priority_scope(scheduler.BULK):
+            job['result'] = func(*args, timings=timings)
+        job['status'] = 'succeeded'
+    except Exception as e:
+        logger.error("Job failed", job_id=job['id'], error=str(e))
+        job['status'] = 'failed'
+        job['error'] = str(e)
+    finally:
+        job['finished_at'] = time.time()
+        job['timings'] = timings
+        _save(job)
+        with _lock:
+            _pending -= 1
+
+
+def submit(func, *args) -> dict:
+    """
+    Queue func(*args, timings=dict) on the background worker pool.
+
+    The function's return value becomes the job result and the timings dict
+    it fills becomes the job's per-stage timings.
+
+    Returns:
+        dict: The new job record.
+
+    Raises:
+        QueueFullError: If MAX_PENDING jobs are already waiting or running.
+    """
+    global _pending
+    with _lock:
+        executor = _get_executor()
+        if _pending >= MAX_PENDING:
+            raise QueueFullError(f"Job queue is full ({MAX_PENDING} pending)")
+        _pending += 1
+
+    job = {
+        'id': uuid.uuid4().hex,
+        'status': 'queued',
+        'submitted_at': time.time(),
+        'request_id': request_id.get(),
+    }
+    _save(job)
+    queued = dict(job)
+    try:
+        executor.submit(bind_context(_run), job, func, args)
+    except Exception:
+        with _lock:
+            _pending -= 1
+        raise
+    return queued
@@ -0,0 +1,134 @@
+import time
+from contextlib import contextmanager
+from Portfolio import artifacts, assets, metrics, renderer, snapshots
+from Portfolio.logs import get_logger
+from Portfolio.enhancer import MODEL_NAME
+from github_fetcher import fetch_repo_summaries, username_from_url
+
+logger = get_logger(__name__)
+
+
+@contextmanager
+def stage(timings: dict | None, name: str):
+    """Record how long the enclosed block took under timings[name], in seconds, and in the stage histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.stage_seconds.observe(elapsed, stage=name)
+        if timings is not None:
+            timings[name] = round(elapsed, 4)
+
+
+def collect_fields(data: dict) -> dict[str, tuple[str, str]]:
+    """Enhanceable fields of a portfolio: field id -> (prompt_instruction, content)"""
+    fields = {}
+    if data.get('about'):
+        fields['about'] = ("Rewrite this about section to be more professional and engaging for a portfolio:", data['about'])
+    for i, project in enumerate(data.get('projects') or []):
+        if project.get('description'):
+            fields[f'project_{i}'] = ("Improve this project description to be more compelling and professional:", project['description'])
+    return fields
+
+
+def apply_enhanced(data: dict, enhanced: dict[str, str]):
+    """Write enhanced field values from collect_fields() ids back into the portfolio, in place"""
+    if 'about' in enhanced:
+        data['about'] = enhanced['about']
+    for i, project in enumerate(data.get('projects') or []):
+        if f'project_{i}' in enhanced:
+            project['description'] = enhanced[f'project_{i}']
+
+
+def enhance_portfolio_data(data) -> tuple[list[str], list[str]]:
+    """
+    Enhance the about section and project descriptions, in place. Fields
+    unchanged since the portfolio was last generated reuse their enhancement.
+
+    Returns:
+        tuple[list[str], list[str]]: Ids of the fields that were enhanced and of
+            those left as submitted (Gemini failed or the deadline ran out).
+    """
+    fields = collect_fields(data)
+    enhanced = snapshots.enhance_changed(snapshots.portfolio_key(data, 'pipeline'), fields)
+    apply_enhanced(data, enhanced)
+    enhanced_ids = [field_id for field_id, (_, content) in fields.items() if enhanced.get(field_id, content) != content]
+    return enhanced_ids, [field_id for field_id in fields if field_id not in enhanced_ids]
+
+
+def fetch_projects(portfolio_data: dict):
+    """Fill in projects from GitHub when a GitHub URL is given and no projects are, in place"""
+    if portfolio_data.get('githubUrl') and not portfolio_data.get('projects'):
+        try:
+            projects = fetch_repo_summaries(username_from_url(portfolio_data['githubUrl']))
+            if projects:
+                portfolio_data['projects'] = projects
+                logger.info("Fetched GitHub projects", count=len(projects))
+        except Exception as e:
+            logger.warning("Error fetching GitHub projects", error=str(e))
+
+
+def artifact_key(portfolio_data: dict, template_file: str) -> str:
+    """
+    Artifact id of a portfolio, computed from its input before any fetch or enhancement.
+
+    The template's version and the asset manifest are part of the id, so an
+    edited template or rebuilt asset is not answered with an old page.
+    """
+    return artifacts.artifact_id(template_file, portfolio_data, MODEL_NAME,
+                                 str(renderer.template_version(template_file)), assets.manifest_version())
+
+
+def generate(portfolio_data: dict, template_file: str, timings: dict | None = None, artifact: str | None = None) -> dict:
+    """
+    Run the generation pipeline: GitHub fetch, AI enhancement, render and store.
+
+    An identical earlier submission is answered from the artifact store
+    without fetching, enhancing or rendering again.
+
+    Args:
+        portfolio_data (dict): Portfolio fields; updated in place with fetched and enhanced content.
+        template_file (str): Template file name in the shared registry.
+        timings (dict | None): Filled with per-stage durations in seconds.
+        artifact (str | None): Precomputed artifact_key() of the input.
+
+    Returns:
+        dict: artifact_id, output_path, whether the artifact was already stored
+            (cached), and which fields were enhanced (enhanced_fields) or kept
+            as submitted (raw_fields).
+    """
+    artifact = artifact or artifact_key(portfolio_data, template_file)
+    with stage(timings, 'lookup'):
+        existing = artifacts.find(artifact)
+    if existing:
+        # Only fully enhanced portfolios are stored under the input's own id
+        return {'artifact_id': artifact, 'output_path': existing, 'cached': True,
+                'enhanced_fields': list(collect_fields(portfolio_data)), 'raw_fields': []}
+
+    # Fetch GitHub projects if GitHub URL is provided
+    if portfolio_data.get('githubUrl') and not portfolio_data.get('projects'):
+        with stage(timings, 'github'):
+            fetch_projects(portfolio_data)
+
+    # Enhance content with AI
+    with stage(timings, 'enhance'):
+        try:
+            enhanced_fields, raw_fields = enhance_portfolio_data(portfolio_data)
+            logger.info("Content enhanced with AI", enhanced=len(enhanced_fields), raw=len(raw_fields))
+        except Exception as e:
+            logger.error("Error enhancing content", error=str(e))
+            enhanced_fields, raw_fields = [], list(collect_fields(portfolio_data))
+
+    if raw_fields:
+        # A degraded result gets its own id so a later request for the same input tries again
+        artifact = artifacts.artifact_id(template_file, {'artifact': artifact, 'raw_fields': raw_fields}, 'partial')
+
+    with stage(timings, 'render'):
+        html_content = renderer.render_template(template_file, portfolio_data)
+
+    with stage(timings, 'write'):
+        output_path = artifacts.save(artifact, html_content)
+
+    return {'artifact_id': artifact, 'output_path': output_path, 'cached': False,
+            'enhanced_fields': enhanced_fields, 'raw_fields': raw_fields}
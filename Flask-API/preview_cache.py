@@ -0,0 +1,84 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from Portfolio import compression, metrics
+
+# Bounds for the in-memory store of rendered previews
+MAX_ENTRIES = int(os.getenv("PREVIEW_CACHE_ENTRIES", "256"))
+MAX_BYTES = int(os.getenv("PREVIEW_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def preview_key(template_name: str, data, template_version=None) -> str:
+    """Canonical hash of a preview request; also the basis of its ETag."""
+    canonical = json.dumps(
+        {'templateName': template_name, 'data': data, 'version': template_version},
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PreviewCache:
+    """
+    Thread-safe LRU of rendered preview HTML, and of compressed response
+    bodies built from it, bounded by entry count and total size.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                metrics.cache_requests.inc(cache="preview", result="miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        metrics.cache_requests.inc(cache="preview", result="hit")
+        return html
+
+    def set(self, key: str, html: str):
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = html
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def encoded(self, key: str, encoding: str, body: bytes) -> bytes:
+        """body compressed with encoding; compressed once, then kept in the LRU beside the previews"""
+        variant = f"{key}:{encoding}"
+        with self._lock:
+            data = self._entries.get(variant)
+            if data is not None:
+                self._entries.move_to_end(variant)
+                return data
+        data = compression.compress(body, encoding, fast=True)
+        self.set(variant, data)
+        return data
+
+    def capture(self, key: str, chunks):
+        """Yield chunks through unchanged and store the joined HTML once the stream completes."""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self.set(key, ''.join(parts))
+
+
+previews = PreviewCache()
@@ -1,5 +1,6 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
+from Portfolio.registry import templates as template_registry
 
 app = Flask(__name__)
 CORS(app)
@@ -7,9 +8,8 @@ CORS(app)
 def get_available_templates():
     """Get list of available templates"""
     return [
-        {'name': 'Modern', 'file': 'template_portfolio.html', 'description': 'Modern glassmorphism design with video background'},
-        {'name': 'Creative', 'file': 'template_creative.html', 'description': 'Creative design with animations and unique layouts'},
-        {'name': 'Minimal', 'file': 'template_minimal.html', 'description': 'Clean minimal design focused on content'}
+        {'name': t['name'], 'file': t['file'], 'description': t['description']}
+        for t in template_registry.all() if t['available']
     ]
 
 @app.route('/', methods=['GET'])
@@ -1,27 +1,12 @@
 import os
 import json
-from jinja2 import Environment, FileSystemLoader
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
-if api_key:
-    genai.configure(api_key=api_key)
+from jinja2 import TemplateNotFound
+from Portfolio import renderer
+from Portfolio.registry import templates as template_registry
 
 def get_available_templates():
     """Get list of available templates"""
-    template_dir = "templates"
-    if not os.path.exists(template_dir):
-        template_dir = "Flask-API/Portfolio/templates"
-    
-    templates = []
-    if os.path.exists(template_dir):
-        for file in os.listdir(template_dir):
-            if file.endswith('.html'):
-                templates.append(file)
-    return templates
+    return [t['file'] for t in template_registry.all() if t['available']]
 
 def select_template():
     """Allow user to select a template"""
@@ -96,21 +81,13 @@ def collect_portfolio_data():
 def generate_portfolio_with_template(template_name, data):
     """Generate portfolio using selected template and data"""
     try:
-        # Try different template directories
-        template_dirs = ["templates", "Flask-API/Portfolio/templates", "."]
-        env = None
-        
-        for template_dir in template_dirs:
-            if os.path.exists(os.path.join(template_dir, template_name)):
-                env = Environment(loader=FileSystemLoader(template_dir))
-                break
-        
-        if not env:
+        try:
+            template = renderer.get_template(template_name)
+        except TemplateNotFound:
             print(f"❌ Template {template_name} not found!")
             return False
         
-        template = env.get_template(template_name)
-        html_content = template.render(**data)
+        html_content = template.render(**template_registry.validator()(data))
         
         # Create output directory
         os.makedirs("output", exist_ok=True)